@@ -0,0 +1,54 @@
+from typing import Iterator, Tuple
+
+# 动作编码
+# 每次最多拖动牌堆顶部的5张明牌，size 表示拖动的张数（1-5）
+PILE_COUNT = 6
+MAX_MOVE_CARDS = 5
+
+# 移动动作：(from_pile * 6 + to_pile) * 5 + (size - 1)，同一对牌堆的5个动作位相邻
+MOVE_ACTION_COUNT = PILE_COUNT * PILE_COUNT * MAX_MOVE_CARDS
+# 结算动作：MOVE_ACTION_COUNT + from_pile * 5 + (size - 1)
+SETTLE_ACTION_COUNT = PILE_COUNT * MAX_MOVE_CARDS
+ACTION_COUNT = MOVE_ACTION_COUNT + SETTLE_ACTION_COUNT
+
+# 动作类型
+MOVE = 'move'
+SETTLE = 'settle'
+
+# 目标牌堆没有明牌时的顶部数值，任何卡牌都可以放上去
+EMPTY_TOP_VALUE = 17
+
+# 扩展操作码（录像和日志用），紧跟在动作编号之后，参数另外给出
+OP_MOVE = ACTION_COUNT  # 参数 from_pile, to_pile, start：不是从顶部开始的移动
+OP_SETTLE = ACTION_COUNT + 1  # 参数 from_pile, start：超过5张的结算
+OP_BEGIN_SETTLEMENT = ACTION_COUNT + 2  # 参数 from_pile, start：界面拖入结算区，卡牌先移出牌堆
+OP_RESOLVE_SETTLEMENT = ACTION_COUNT + 3  # 无参数：界面展示结束后结算
+OP_PENALTY = ACTION_COUNT + 4  # 参数 amount：难度惩罚扣血
+
+
+def move_action(from_pile: int, to_pile: int, size: int) -> int:
+    """编码移动动作"""
+    return (from_pile * PILE_COUNT + to_pile) * MAX_MOVE_CARDS + size - 1
+
+
+def settle_action(from_pile: int, size: int) -> int:
+    """编码结算动作"""
+    return MOVE_ACTION_COUNT + from_pile * MAX_MOVE_CARDS + size - 1
+
+
+def decode_action(action: int) -> Tuple[str, int, int, int]:
+    """解码动作，返回 (动作类型, from_pile, to_pile, size)，结算动作的 to_pile 为 -1"""
+    if action < MOVE_ACTION_COUNT:
+        pair, size_index = divmod(action, MAX_MOVE_CARDS)
+        from_pile, to_pile = divmod(pair, PILE_COUNT)
+        return MOVE, from_pile, to_pile, size_index + 1
+    from_pile, size_index = divmod(action - MOVE_ACTION_COUNT, MAX_MOVE_CARDS)
+    return SETTLE, from_pile, -1, size_index + 1
+
+
+def iter_actions(mask: int) -> Iterator[int]:
+    """遍历位掩码中所有为1的动作编号"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
@@ -0,0 +1,245 @@
+import os
+import struct
+import threading
+import zlib
+from typing import List, Optional, Tuple
+from game import Game, RULESET_VERSION
+from replay import encode_op, decode_ops, encode_varint, decode_varint, zigzag, unzigzag, apply_op
+from save import HEADER as SNAPSHOT_HEADER, Snapshot, encode_snapshot, decode_snapshot, save_writer
+
+# 自动存档日志（预写日志）：每个操作追加一条记录，定期压缩为完整存档
+#
+# 日志文件头  MAGIC(4) 格式版本(u2) 规则版本(u2)
+# 每条记录    类型(u1) 长度(u1) 内容 CRC32(u4，校验类型、长度和内容)
+#   REC_OP        内容为录像操作编码（见 replay.py），通常只有几字节
+#   REC_TURN      varint(move_count) varint(zigzag(last_turn))
+#   REC_SNAPSHOT  u4：此刻写出的存档的 CRC，恢复时从与现有存档匹配的最后一个标记之后重放
+#   REC_CLOSE     正常退出标记，最后一条记录不是它说明上次没有正常退出
+# 断电时末尾可能留下写了一半的记录，CRC 不符的记录及其之后的内容全部忽略
+MAGIC = b'CJNL'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH')
+RECORD_HEADER = struct.Struct('<BB')
+RECORD_CRC = struct.Struct('<I')
+
+REC_OP = 1
+REC_TURN = 2
+REC_SNAPSHOT = 3
+REC_CLOSE = 4
+
+# 每隔多少条记录压缩一次
+COMPACT_INTERVAL = 64
+
+# 后台线程的命令
+_CMD_RECORD = 0  # 追加一条已编码的记录
+_CMD_MARK = 1  # 追加存档标记，此后的记录同时保留在内存中
+_CMD_ROTATE = 2  # 标记对应的存档已落盘，轮换日志
+
+
+def encode_record(kind: int, payload: bytes) -> bytes:
+    head = RECORD_HEADER.pack(kind, len(payload)) + payload
+    return head + RECORD_CRC.pack(zlib.crc32(head))
+
+
+def snapshot_marker(data: bytes) -> bytes:
+    """存档文件头中的 CRC，作为日志里 REC_SNAPSHOT 标记的内容"""
+    return data[SNAPSHOT_HEADER.size - RECORD_CRC.size:SNAPSHOT_HEADER.size]
+
+
+def decode_records(data: bytes, pos: int):
+    """逐条产出 (类型, 内容)，遇到不完整或校验失败的记录即停止"""
+    while pos + RECORD_HEADER.size <= len(data):
+        kind, length = RECORD_HEADER.unpack_from(data, pos)
+        end = pos + RECORD_HEADER.size + length
+        if end + RECORD_CRC.size > len(data):
+            return
+        if RECORD_CRC.unpack_from(data, end)[0] != zlib.crc32(data[pos:end]):
+            return
+        yield kind, data[pos + RECORD_HEADER.size:end]
+        pos = end + RECORD_CRC.size
+
+
+class AutoSaver:
+    """一局的自动存档：作为 Game.recorder 追加操作记录，定期压缩为存档
+
+    主线程每个操作只把几字节的记录放入队列，日志文件的写入、落盘和轮换都在后台线程完成。
+    压缩时存档交给 save_writer 写出，落盘后再把日志替换为只含新标记和此后记录的新文件，
+    日志大小因此不会随对局增长；替换之前断电时旧日志仍然完整。
+    """
+
+    def __init__(self, game: Game, snapshot_path: str, journal_path: str, difficulty: Optional[int] = None,
+                 move_count: int = 0, last_turn: int = 0):
+        self.game = game
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.difficulty = difficulty
+        self.move_count = move_count
+        self.last_turn = last_turn
+        self.records = 0
+        # 以下状态只由后台线程访问；第一次轮换之前旧日志保持不动，新记录只保留在内存中
+        self._file = None
+        self._marker: Optional[bytes] = None  # 等待落盘的存档标记
+        self._tail: List[bytes] = []  # 该标记之后追加的记录，轮换时写入新日志
+        # 主线程与后台线程之间的命令队列
+        self._queue: List[Tuple[int, bytes]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._sync_loop, name="autosave-sync", daemon=True)
+        self._thread.start()
+        # 新会话的起点存档同样交给 save_writer，落盘后用只含其标记的新日志替换上一次会话的日志
+        self.compact()
+        game.recorder = self
+
+    def __call__(self, op: int, *args: int):
+        # 部分操作在修改局面之前调用 recorder，这里只追加记录，压缩留到 update
+        self._append(REC_OP, encode_op(op, *args))
+
+    def update(self, move_count: int, last_turn: int):
+        """每帧调用：记录变化的界面回合状态，记录数达到 COMPACT_INTERVAL 时压缩"""
+        if (move_count, last_turn) != (self.move_count, self.last_turn):
+            self.move_count = move_count
+            self.last_turn = last_turn
+            self._append(REC_TURN, encode_varint(move_count) + encode_varint(zigzag(last_turn)))
+        if self.records >= COMPACT_INTERVAL:
+            self.compact()
+
+    def compact(self):
+        """在日志中留下标记并提交完整存档，存档落盘后日志轮换为只含该标记之后的记录"""
+        data = encode_snapshot(self.game, self.move_count, self.last_turn, self.difficulty)
+        marker = snapshot_marker(data)
+        self._submit(_CMD_MARK, marker)
+        save_writer.save(self.snapshot_path, data, lambda: self._submit(_CMD_ROTATE, marker))
+        self.records = 0
+
+    def close(self):
+        """正常退出：压缩并写入退出标记；对局已结束时删除存档和日志"""
+        if self._closed:
+            return
+        finished = self.game.check_game_over() or self.game.check_win_condition()
+        if not finished:
+            self.compact()
+            self._append(REC_CLOSE, b'')
+            # 等待存档落盘，日志轮换的命令随之入队
+            save_writer.flush()
+        if self.game.recorder is self:
+            self.game.recorder = None
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        # 后台线程处理完队列中的命令后关闭日志文件并退出
+        self._thread.join()
+        if finished:
+            save_writer.delete(self.snapshot_path)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def _append(self, kind: int, payload: bytes):
+        if self._closed:
+            return
+        self._submit(_CMD_RECORD, encode_record(kind, payload))
+        self.records += 1
+
+    def _submit(self, command: int, payload: bytes):
+        with self._condition:
+            self._queue.append((command, payload))
+            self._condition.notify()
+
+    def _sync_loop(self):
+        # 一次取出队列中的全部命令，多条记录合并为一次 fsync
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                commands, self._queue = self._queue, []
+                if not commands:
+                    break
+            dirty = False
+            for command, payload in commands:
+                if command == _CMD_RECORD:
+                    if self._file is not None:
+                        self._file.write(payload)
+                        dirty = True
+                    if self._marker is not None:
+                        self._tail.append(payload)
+                elif command == _CMD_MARK:
+                    if self._file is not None:
+                        self._file.write(encode_record(REC_SNAPSHOT, payload))
+                        dirty = True
+                    self._marker = payload
+                    self._tail = []
+                elif payload == self._marker:
+                    # 对应的存档已经落盘（被更新的存档取代的标记不会走到这里）
+                    self._rotate()
+                    dirty = False
+            if dirty:
+                os.fsync(self._file.fileno())
+        if self._file is not None:
+            self._file.close()
+
+    def _rotate(self):
+        """用只含最新标记及其后记录的新日志替换当前日志"""
+        tmp_path = self.journal_path + '.tmp'
+        try:
+            directory = os.path.dirname(tmp_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, RULESET_VERSION))
+                f.write(encode_record(REC_SNAPSHOT, self._marker))
+                f.write(b''.join(self._tail))
+                f.flush()
+                os.fsync(f.fileno())
+            # 先关闭再替换（Windows 不能替换打开中的文件）
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+                self._file.close()
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            print(f"轮换自动存档日志失败: {e}")
+            if self._file is None:
+                # 还没有属于本会话的日志，不能追加到上一次会话的日志中，保留记录等待下一次轮换
+                return
+        if self._file is None or self._file.closed:
+            self._file = open(self.journal_path, 'ab', buffering=0)
+        self._marker = None
+        self._tail = []
+
+
+def recover(snapshot_path: str, journal_path: str) -> Tuple[Optional[Snapshot], bool]:
+    """从存档和日志末尾重建会话，返回 (快照, 上次是否正常退出)
+
+    没有存档或存档损坏时返回 (None, True)。
+    """
+    try:
+        with open(snapshot_path, 'rb') as f:
+            data = f.read()
+        snapshot = decode_snapshot(data)
+    except (OSError, ValueError):
+        return None, True
+    snapshot_crc = snapshot_marker(data)
+    try:
+        with open(journal_path, 'rb') as f:
+            journal = f.read()
+    except OSError:
+        return snapshot, True
+    if len(journal) < HEADER.size or HEADER.unpack_from(journal) != (MAGIC, FORMAT_VERSION, RULESET_VERSION):
+        return snapshot, True
+
+    records = list(decode_records(journal, HEADER.size))
+    # 从与现有存档匹配的最后一个标记开始；找不到说明存档比日志更新，直接使用存档
+    start = None
+    for i, (kind, payload) in enumerate(records):
+        if kind == REC_SNAPSHOT and payload == snapshot_crc:
+            start = i + 1
+    if start is None:
+        return snapshot, True
+    game, move_count, last_turn, difficulty = snapshot
+    clean = False
+    for kind, payload in records[start:]:
+        clean = kind == REC_CLOSE
+        if kind == REC_OP:
+            for op, args in decode_ops(payload)[0]:
+                apply_op(game, op, args)
+        elif kind == REC_TURN:
+            move_count, pos = decode_varint(payload, 0)
+            last_turn = unzigzag(decode_varint(payload, pos)[0])
+    return Snapshot(game, move_count, last_turn, difficulty), clean
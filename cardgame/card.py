@@ -1,22 +1,56 @@
+from typing import Dict, List, Tuple
 from config import CARD_TYPES, CARD_VALUES
 
 class Card:
-    def __init__(self, card_type: str, value: int, face_up: bool = True):
+    """卡牌身份（类型+数值）
+
+    每种类型和数值的组合只有一个共享实例（享元），可以直接用 is 比较；
+    卡牌的正反面状态由所在牌堆记录，而不是记录在卡牌上。
+    """
+    __slots__ = ('type', 'value', 'id')
+
+    def __new__(cls, card_type: str, value: int):
+        card = _CARD_LOOKUP.get((card_type, value))
+        if card is not None:
+            return card
         if card_type not in CARD_TYPES:
             raise ValueError(f"无效的卡牌类型: {card_type}")
-        if value not in CARD_VALUES:
-            raise ValueError(f"无效的卡牌数值: {value}")
-        
-        self.type = card_type
-        self.value = value
-        self.face_up = face_up
-    
-    def flip(self):
-        """翻转卡牌"""
-        self.face_up = not self.face_up
-    
+        raise ValueError(f"无效的卡牌数值: {value}")
+
+    @classmethod
+    def _create(cls, card_type: str, value: int, card_id: int) -> 'Card':
+        card = object.__new__(cls)
+        card.type = card_type
+        card.value = value
+        card.id = card_id  # 在CARD_POOL中的下标：类型下标 * 16 + 数值 - 1
+        return card
+
+    def __reduce__(self):
+        # 反序列化时取回共享实例
+        return (Card, (self.type, self.value))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __str__(self):
         return f"{self.type}({self.value})"
-    
+
     def __repr__(self):
-        return self.__str__() 
\ No newline at end of file
+        return self.__str__()
+
+
+# 共享卡牌表：按 id 索引的全部类型/数值组合
+CARD_POOL: List[Card] = [
+    Card._create(card_type, value, type_index * len(CARD_VALUES) + value_index)
+    for type_index, card_type in enumerate(CARD_TYPES)
+    for value_index, value in enumerate(CARD_VALUES)
+]
+_CARD_LOOKUP: Dict[Tuple[str, int], Card] = {(card.type, card.value): card for card in CARD_POOL}
+
+
+def card_from_id(card_id: int) -> Card:
+    """根据 id 获取共享卡牌实例"""
+    return CARD_POOL[card_id]
@@ -0,0 +1,51 @@
+import pygame
+from typing import Dict, List
+from config import CARD_TYPES, CARD_VALUES, NUM_IMAGE_OFFSET, NUM_IMAGE_SCALE
+from card import Card
+
+
+class CardAtlas:
+    """某个缩放比例下的卡牌图集：64种牌面和牌背预先渲染到一张图上
+
+    第 i 行是 CARD_TYPES[i] 类型的16种数值，最后一行是牌背；
+    每个牌面是图集的子表面，按卡牌 id 取用，绘制一张卡牌只需一次 blit。
+    """
+
+    def __init__(self, type_images: Dict[str, pygame.Surface], back_image: pygame.Surface,
+                 num_images: Dict[int, pygame.Surface], scale: float = 1.0):
+        self.scale = scale
+        width, height = back_image.get_size()
+        if scale != 1.0:
+            width, height = int(width * scale), int(height * scale)
+        self.card_size = (width, height)
+        columns = len(CARD_VALUES)
+        self.surface = pygame.Surface((columns * width, (len(CARD_TYPES) + 1) * height), pygame.SRCALPHA).convert_alpha()
+
+        self.faces: List[pygame.Surface] = []
+        for row, card_type in enumerate(CARD_TYPES):
+            body = self._scaled(type_images[card_type])
+            for column, value in enumerate(CARD_VALUES):
+                rect = pygame.Rect(column * width, row * height, width, height)
+                face = self.surface.subsurface(rect)
+                face.blit(body, (0, 0))
+                num_img = num_images.get(value)
+                if num_img:
+                    offset_x, offset_y = NUM_IMAGE_OFFSET
+                    num_scale = NUM_IMAGE_SCALE * scale
+                    scaled_num_width = int(num_img.get_width() * num_scale)
+                    scaled_num_height = int(num_img.get_height() * num_scale)
+                    scaled_num_img = pygame.transform.smoothscale(num_img, (scaled_num_width, scaled_num_height))
+                    num_x = (width - scaled_num_width) // 2 + int(offset_x * scale)
+                    num_y = int(offset_y * scale)
+                    face.blit(scaled_num_img, (num_x, num_y))
+                self.faces.append(face)
+        self.back = self.surface.subsurface(pygame.Rect(0, len(CARD_TYPES) * height, width, height))
+        self.back.blit(self._scaled(back_image), (0, 0))
+
+    def _scaled(self, image: pygame.Surface) -> pygame.Surface:
+        if self.scale == 1.0:
+            return image
+        return pygame.transform.smoothscale(image, self.card_size)
+
+    def face(self, card: Card) -> pygame.Surface:
+        return self.faces[card.id]
@@ -165,6 +165,8 @@ UI_IMAGES = {
 
 # 血量上限
 MAX_HEALTH = 100 # 可根据需要修改
+# 开局血量
+INITIAL_HEALTH = 5
 
 # 血量数值显示参数
 HP_FONT_SIZE = 32  # 字体大小
@@ -189,6 +191,19 @@ HEAD_MOVE_Y = 16  # headL/headR垂直方向最大偏移像素
 # 消灭诅咒卡总数文本显示位置（屏幕坐标）
 DESTROYED_CURSE_TEXT_POS = (screen_width-150, 70)  # (x, y)
 
+# 存档文件路径
+SAVE_FILE = "saves/savegame.bin"
+# 自动存档日志路径（存档之后的操作记录）
+JOURNAL_FILE = "saves/savegame.journal"
+
+# 游戏循环参数
+UPDATE_RATE = 60  # 每秒固定的逻辑更新次数（结算计时、头像动画等）
+FRAME_RATE_LIMIT = 60  # 帧率上限，0为不限帧
+VSYNC = False  # 垂直同步：由显示器刷新率控制帧率，忽略 FRAME_RATE_LIMIT
+MAX_FRAME_TIME = 0.25  # 单帧最多追赶的逻辑时间（秒），卡顿后不会连续追帧
+FRAME_PACER_SPIN = False  # 帧末尾忙等到目标时间（帧间隔更稳定，但每帧多占用约1毫秒CPU）
+SHOW_FRAME_STATS = False  # 退出时打印帧率和帧时间统计
+
 
 
 
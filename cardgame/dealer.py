@@ -0,0 +1,202 @@
+import random
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+import numpy as np
+from card import CARD_POOL
+
+# 牌局以发牌顺序的52个卡牌 id 表示（编码见 card.py：类型下标 * 16 + 数值 - 1），
+# 按 [9, 9, 8, 8, 9, 9] 依次分给6个牌堆，与 Game.initialize_game 一致
+PILE_COUNTS = (9, 9, 8, 8, 9, 9)
+DEAL_SIZE = sum(PILE_COUNTS)
+PILE_OFFSETS = tuple(sum(PILE_COUNTS[:i]) for i in range(len(PILE_COUNTS)))
+CARD_ID_COUNT = len(CARD_POOL)
+VALUES_PER_TYPE = 16
+CURSE_TYPE_INDEX = 2
+
+# 批量筛选条件：输入 (N, 52) 的牌局数组，返回长度为 N 的布尔数组
+DealFilter = Callable[[np.ndarray], np.ndarray]
+
+
+def deal_order(count: int) -> Tuple[int, ...]:
+    """first_flip 之后牌堆从底到顶对应的发牌下标（原顶部的牌压在三张明牌下面）"""
+    face_up = min(3, count - 1)
+    order = list(range(count))
+    top = order.pop()
+    order.insert(count - 1 - face_up, top)
+    return tuple(order)
+
+
+def _face_up_indices() -> Tuple[int, ...]:
+    indices = []
+    for offset, count in zip(PILE_OFFSETS, PILE_COUNTS):
+        order = deal_order(count)
+        indices.extend(offset + i for i in order[count - min(3, count - 1):])
+    return tuple(indices)
+
+
+# 开局翻开的18张牌在发牌顺序中的下标
+FACE_UP_INDICES = _face_up_indices()
+
+
+def random_deals(count: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """生成 count 局均匀随机的牌局，形状 (count, 52)，不对应任何 Game 种子"""
+    if rng is None:
+        rng = np.random.default_rng()
+    return rng.integers(0, CARD_ID_COUNT, size=(count, DEAL_SIZE), dtype=np.uint8)
+
+
+# --- 按种子批量发牌：向量化复现 random.Random(seed) 的 MT19937 输出 ---
+_MT_N = 624
+_MT_M = 397
+# 每局最多使用的随机数个数：randrange(64) 每次取7位，约一半被拒绝，
+# 52张牌平均需要104个输出。只用前 _MT_N - _MT_M 个输出时，第一轮旋转无需依赖已旋转的状态
+_OUTPUTS = _MT_N - _MT_M
+_SEED_CHUNK = 8192
+
+
+def _init_genrand(seed: int) -> np.ndarray:
+    mt = np.empty(_MT_N, dtype=np.uint32)
+    mt[0] = seed
+    for i in range(1, _MT_N):
+        prev = int(mt[i - 1])
+        mt[i] = (1812433253 * (prev ^ (prev >> 30)) + i) & 0xFFFFFFFF
+    return mt
+
+
+_GENRAND_BASE = _init_genrand(19650218)
+
+
+def _mt_outputs(seeds: np.ndarray) -> np.ndarray:
+    """对每个32位种子按 init_by_array([seed]) 初始化，返回前 _OUTPUTS 个32位输出，形状 (_OUTPUTS, N)"""
+    n = len(seeds)
+    key = seeds.astype(np.uint32)
+    mt = np.repeat(_GENRAND_BASE[:, None], n, axis=1)  # (624, N)，逐行更新时内存连续
+    tmp = np.empty(n, dtype=np.uint32)
+    # 两轮混合都是顺序依赖的，只能逐行推进；每行用原地运算避免临时数组
+    i = 1
+    for k in range(2 * _MT_N - 1):
+        prev, row = mt[i - 1], mt[i]
+        np.right_shift(prev, 30, out=tmp)
+        np.bitwise_xor(tmp, prev, out=tmp)
+        if k < _MT_N:
+            np.multiply(tmp, np.uint32(1664525), out=tmp)
+            np.bitwise_xor(row, tmp, out=row)
+            np.add(row, key, out=row)
+        else:
+            np.multiply(tmp, np.uint32(1566083941), out=tmp)
+            np.bitwise_xor(row, tmp, out=row)
+            np.subtract(row, np.uint32(i), out=row)
+        i += 1
+        if i >= _MT_N:
+            mt[0] = mt[_MT_N - 1]
+            i = 1
+    mt[0] = 0x80000000
+
+    # 第一轮旋转的前 _OUTPUTS 个元素只依赖未旋转的状态
+    y = (mt[:_OUTPUTS] & np.uint32(0x80000000)) | (mt[1:_OUTPUTS + 1] & np.uint32(0x7FFFFFFF))
+    y = mt[_MT_M:_MT_M + _OUTPUTS] ^ (y >> 1) ^ np.where(y & 1, np.uint32(0x9908B0DF), np.uint32(0))
+    # 输出变换
+    y ^= y >> 11
+    y ^= (y << 7) & np.uint32(0x9D2C5680)
+    y ^= (y << 15) & np.uint32(0xEFC60000)
+    y ^= y >> 18
+    return y
+
+
+def _python_deal(seed: int) -> np.ndarray:
+    rng = random.Random(seed)
+    return np.array([rng.randrange(CARD_ID_COUNT) for _ in range(DEAL_SIZE)], dtype=np.uint8)
+
+
+def deals_from_seeds(seeds: Sequence[int]) -> np.ndarray:
+    """批量计算 Game(seed) 的发牌结果，形状 (N, 52)，与 initialize_game 逐张一致
+
+    种子需在 [0, 2**32) 内；随机数不足的极少数种子回退到逐个用 random.Random 计算。
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    if len(seeds) and (seeds.min() < 0 or seeds.max() >= 1 << 32):
+        raise ValueError("种子必须在 [0, 2**32) 范围内")
+    deals = np.empty((len(seeds), DEAL_SIZE), dtype=np.uint8)
+    # 每个种子的 MT 状态占 2.5KB，分块计算限制内存占用
+    for start in range(0, len(seeds), _SEED_CHUNK):
+        chunk = seeds[start:start + _SEED_CHUNK]
+        # randrange(64) 取输出的高7位，大于等于64时拒绝重抽；按 (输出序号, 种子) 布局保持内存连续
+        bits = (_mt_outputs(chunk) >> 25).astype(np.uint8)
+        accepted = bits < CARD_ID_COUNT
+        rank = np.cumsum(accepted, axis=0, dtype=np.int16)
+        outputs, cols = np.nonzero(accepted & (rank <= DEAL_SIZE))
+        columns = np.empty((DEAL_SIZE, len(chunk)), dtype=np.uint8)
+        columns[rank[outputs, cols] - 1, cols] = bits[outputs, cols]
+        deals[start:start + len(chunk)] = columns.T
+        for row in np.flatnonzero(rank[-1] < DEAL_SIZE):
+            deals[start + row] = _python_deal(int(chunk[row]))
+    return deals
+
+
+# --- 筛选条件 ---
+def is_curse(deals: np.ndarray) -> np.ndarray:
+    return deals // VALUES_PER_TYPE == CURSE_TYPE_INDEX
+
+
+def card_values(deals: np.ndarray) -> np.ndarray:
+    return deals % VALUES_PER_TYPE + 1
+
+
+def max_face_up_curses(limit: int) -> DealFilter:
+    """开局翻开的明牌中诅咒卡不超过 limit 张"""
+    def check(deals: np.ndarray) -> np.ndarray:
+        return is_curse(deals[:, FACE_UP_INDICES]).sum(axis=1) <= limit
+    return check
+
+
+def curse_total_between(low: int = 0, high: Optional[int] = None) -> DealFilter:
+    """诅咒卡数值总和在 [low, high] 内（high 为 None 表示不设上限）"""
+    def check(deals: np.ndarray) -> np.ndarray:
+        total = np.where(is_curse(deals), card_values(deals), 0).sum(axis=1)
+        ok = total >= low
+        if high is not None:
+            ok &= total <= high
+        return ok
+    return check
+
+
+def curse_count_between(low: int = 0, high: Optional[int] = None) -> DealFilter:
+    """诅咒卡数量在 [low, high] 内（high 为 None 表示不设上限）"""
+    def check(deals: np.ndarray) -> np.ndarray:
+        count = is_curse(deals).sum(axis=1)
+        ok = count >= low
+        if high is not None:
+            ok &= count <= high
+        return ok
+    return check
+
+
+def apply_filters(deals: np.ndarray, filters: Iterable[DealFilter]) -> np.ndarray:
+    """同时满足所有筛选条件的布尔掩码"""
+    mask = np.ones(len(deals), dtype=bool)
+    for check in filters:
+        mask &= check(deals)
+    return mask
+
+
+def scan_seeds(start: int, count: int, filters: Iterable[DealFilter] = (),
+               batch_size: int = 65536) -> Iterator[Tuple[int, np.ndarray]]:
+    """扫描种子 [start, start + count)，逐个产出满足全部条件的 (seed, deal)"""
+    filters = list(filters)
+    end = start + count
+    for batch_start in range(start, end, batch_size):
+        seeds = np.arange(batch_start, min(batch_start + batch_size, end), dtype=np.int64)
+        deals = deals_from_seeds(seeds)
+        for row in np.flatnonzero(apply_filters(deals, filters)):
+            yield int(seeds[row]), deals[row]
+
+
+if __name__ == "__main__":
+    # 用法：python dealer.py <起始种子> <数量> <开局诅咒明牌上限>
+    import sys
+    import time
+    first, total, limit = (int(arg) for arg in sys.argv[1:4])
+    began = time.perf_counter()
+    found = [seed for seed, _ in scan_seeds(first, total, [max_face_up_curses(limit)])]
+    elapsed = time.perf_counter() - began
+    print(f"{len(found)} / {total} seeds matched in {elapsed:.2f}s ({total / elapsed:.0f} seeds/s)")
+    print(' '.join(str(seed) for seed in found[:20]))
@@ -0,0 +1,105 @@
+import random
+from typing import Dict, Optional, Tuple
+import numpy as np
+from game import Game
+from card import CARD_POOL
+from config import CARD_TYPES
+from actions import ACTION_COUNT, PILE_COUNT
+from state import PILE_CAPACITY
+
+# 观测中每张卡牌编码为 (类型下标 + 1, 数值)，(0, 0) 表示空位
+CARD_FEATURES = 2
+_CARD_CODES = np.array([(CARD_TYPES.index(card.type) + 1, card.value) for card in CARD_POOL], dtype=np.uint8)
+_MASK_BYTES = (ACTION_COUNT + 7) // 8
+# 上一步结算结果的特征数（见 CardGameEnv 文档）
+SETTLEMENT_FEATURES = 4
+
+# 胜负奖励
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+
+
+class CardGameEnv:
+    """Gymnasium 风格的单局环境（reset/step），不依赖 gymnasium 本身
+
+    动作空间为 ACTION_COUNT 个离散动作（编码见 actions.py）：
+    拖动某牌堆顶部的 size 张明牌（即从 face_up_count - size 开始）到另一牌堆，或拖入结算区。
+    info['action_mask'] 为当前局面的合法动作掩码。
+
+    观测是固定形状的 NumPy 数组字典，每步原地写入预分配的缓冲区
+    （只重新编码版本号变化的牌堆），需要保留历史观测时请自行复制：
+      hidden:     (6,)        各牌堆暗牌数量
+      face_up:    (6, 52, 2)  各牌堆明牌（从下到上）的类型和数值
+      hp:         (1,)        生命值
+      last_settlement: (4,)   上一步结算的结果：生命值变化、防御抵消、攻击消灭、返回牌堆的诅咒卡数量
+                              （上一步不是结算时全为0；结算区在两步之间总是空的，不单独观测）
+    """
+
+    def __init__(self, max_steps: int = 1000):
+        self.max_steps = max_steps
+        self.game: Optional[Game] = None
+        self.steps = 0
+        self._seed_rng = random.Random()
+        self._versions = [-1] * PILE_COUNT
+        self.observation: Dict[str, np.ndarray] = {
+            'hidden': np.zeros(PILE_COUNT, dtype=np.int16),
+            'face_up': np.zeros((PILE_COUNT, PILE_CAPACITY, CARD_FEATURES), dtype=np.uint8),
+            'hp': np.zeros(1, dtype=np.int16),
+            'last_settlement': np.zeros(SETTLEMENT_FEATURES, dtype=np.int16),
+        }
+        self.action_mask = np.zeros(ACTION_COUNT, dtype=bool)
+        self.info = {'action_mask': self.action_mask, 'message': ''}
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None) -> Tuple[Dict[str, np.ndarray], dict]:
+        """开始新的一局，返回 (observation, info)；不指定 seed 时由环境自身的随机数生成器决定"""
+        if seed is None:
+            seed = self._seed_rng.getrandbits(64)
+        else:
+            self._seed_rng.seed(seed)
+        self.game = Game(seed=seed)
+        self.steps = 0
+        self._versions = [-1] * PILE_COUNT
+        self.info['message'] = ''
+        self.observation['last_settlement'][:] = 0
+        self._encode()
+        return self.observation, self.info
+
+    def step(self, action: int) -> Tuple[Dict[str, np.ndarray], float, bool, bool, dict]:
+        """执行一个动作，返回 (observation, reward, terminated, truncated, info)
+
+        非法动作不改变局面，info['message'] 给出原因。
+        """
+        game = self.game
+        before = (game.player.hp, len(game.removed_by_defense), len(game.removed_by_attack), game.returned_curse_count)
+        success, message = game.apply_action(int(action))
+        after = (game.player.hp, len(game.removed_by_defense), len(game.removed_by_attack), game.returned_curse_count)
+        self.observation['last_settlement'][:] = [b - a for a, b in zip(before, after)]
+        self.steps += 1
+        self.info['message'] = message
+        self._encode()
+        reward = 0.0
+        terminated = False
+        if self.game.check_game_over():
+            reward, terminated = LOSS_REWARD, True
+        elif self.game.check_win_condition():
+            reward, terminated = WIN_REWARD, True
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observation, reward, terminated, truncated, self.info
+
+    def _encode(self):
+        """把当前局面写入观测缓冲区和动作掩码"""
+        game = self.game
+        face_up = self.observation['face_up']
+        hidden = self.observation['hidden']
+        for i, pile in enumerate(game.piles):
+            if pile.version == self._versions[i]:
+                continue
+            self._versions[i] = pile.version
+            count = pile.face_up_count
+            hidden[i] = pile.hidden_count
+            face_up[i, count:] = 0
+            if count:
+                face_up[i, :count] = _CARD_CODES[[card.id for card in pile.peek_face_up(0, count)]]
+        self.observation['hp'][0] = game.player.hp
+        bits = np.frombuffer(game.legal_actions().to_bytes(_MASK_BYTES, 'little'), dtype=np.uint8)
+        self.action_mask[:] = np.unpackbits(bits, bitorder='little')[:ACTION_COUNT]
@@ -0,0 +1,36 @@
+from typing import Callable, Dict, List
+
+# 领域事件类型
+DAMAGE_TAKEN = 'damage_taken'  # 玩家受到伤害，参数: amount, hp
+HEALED = 'heal'  # 玩家恢复生命，参数: amount, hp
+CARD_FLIPPED = 'card_flipped'  # 牌堆翻开卡牌，参数: pile, card
+SETTLEMENT_RESOLVED = 'settlement_resolved'  # 结算完成，参数: success, message
+
+
+class EventEmitter:
+    """简单的事件分发器，规则引擎只负责发出事件，界面和音效层自行订阅"""
+
+    def __init__(self):
+        self.listeners: Dict[str, List[Callable[..., None]]] = {}
+
+    def subscribe(self, event_type: str, callback: Callable[..., None]):
+        """订阅事件"""
+        self.listeners.setdefault(event_type, []).append(callback)
+
+    def unsubscribe(self, event_type: str, callback: Callable[..., None]):
+        """取消订阅事件"""
+        callbacks = self.listeners.get(event_type)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+
+    def emit(self, event_type: str, **payload):
+        """发出事件，没有订阅者时直接返回"""
+        callbacks = self.listeners.get(event_type)
+        if not callbacks:
+            return
+        for callback in list(callbacks):
+            callback(**payload)
+
+    def __deepcopy__(self, memo):
+        # 复制出来的对局（搜索、模拟）不应触发界面和音效回调
+        return EventEmitter()
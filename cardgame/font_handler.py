@@ -0,0 +1,79 @@
+import pygame
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# 描边宽度（像素），带描边的文本四周各多出这么宽
+OUTLINE_WIDTH = 1
+
+FontKey = Tuple[Optional[str], int, bool]
+
+
+class FontHandler:
+    def __init__(self, max_cached_texts: int = 256):
+        # 字体注册表：(字体文件或系统字体名, 字号, 是否系统字体) -> Font，整个进程共享
+        self.fonts: Dict[FontKey, pygame.font.Font] = {}
+        # 渲染结果的 LRU 缓存：(字体, 文本, 颜色, 描边颜色) -> Surface
+        self.text_cache: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.max_cached_texts = max_cached_texts
+
+    def get_font(self, size: int, name: Optional[str] = None, sysfont: bool = False) -> pygame.font.Font:
+        """获取字体（只在第一次使用时创建）
+        Args:
+            size: 字号
+            name: 字体文件路径，sysfont 为 True 时为系统字体名；None 为 pygame 默认字体
+            sysfont: 是否按名称查找系统字体
+        Returns:
+            pygame.font.Font对象
+        """
+        key = (name, size, sysfont)
+        font = self.fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.SysFont(name, size) if sysfont else pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text: str, size: int, color, name: Optional[str] = None, sysfont: bool = False,
+               outline=None) -> pygame.Surface:
+        """渲染文本，相同的文本、字体和颜色直接返回缓存的 Surface（调用方不要修改它）
+        Args:
+            text: 文本
+            size, name, sysfont: 同 get_font
+            color: 文字颜色
+            outline: 描边颜色，None 为不描边；描边后的 Surface 四周各多出 OUTLINE_WIDTH 像素
+        Returns:
+            渲染好的 Surface
+        """
+        key = (name, size, sysfont, text, tuple(color), None if outline is None else tuple(outline))
+        surface = self.text_cache.get(key)
+        if surface is not None:
+            self.text_cache.move_to_end(key)
+            return surface
+        font = self.get_font(size, name, sysfont)
+        surface = font.render(text, True, color)
+        if outline is not None:
+            surface = self._bake_outline(font, text, surface, outline)
+        self.text_cache[key] = surface
+        if len(self.text_cache) > self.max_cached_texts:
+            self.text_cache.popitem(last=False)
+        return surface
+
+    def _bake_outline(self, font: pygame.font.Font, text: str, surface: pygame.Surface, outline) -> pygame.Surface:
+        """把文本向8个方向偏移绘制的描边和文本本身合成为一张 Surface"""
+        outline_text = font.render(text, True, outline)
+        w = OUTLINE_WIDTH
+        baked = pygame.Surface((surface.get_width() + 2 * w, surface.get_height() + 2 * w), pygame.SRCALPHA)
+        for dx in (-w, 0, w):
+            for dy in (-w, 0, w):
+                if dx != 0 or dy != 0:
+                    baked.blit(outline_text, (w + dx, w + dy))
+        baked.blit(surface, (w, w))
+        return baked
+
+    def clear(self):
+        """清空渲染缓存（字体保留）"""
+        self.text_cache.clear()
+
+# 创建单例实例
+font_handler = FontHandler()
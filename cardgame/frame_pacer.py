@@ -0,0 +1,65 @@
+import time
+from collections import deque
+from typing import NamedTuple
+
+# 开启忙等时，距离目标时间不足这么多秒改为忙等（time.sleep 的唤醒精度有限，直接睡到目标时间会抖动）
+SPIN_THRESHOLD = 0.001
+
+
+class FrameStats(NamedTuple):
+    """最近若干帧的帧时间统计（毫秒）"""
+    fps: float
+    mean_ms: float
+    p99_ms: float
+    max_ms: float
+    jitter_ms: float  # 帧时间的标准差
+
+
+class FramePacer:
+    """帧节奏控制，取代 pygame.time.Clock.tick
+
+    目标时间点按固定周期推进而不是从“现在”重新计算，误差不会逐帧累积；
+    默认直接睡眠到目标时间；spin 为 True 时先睡眠到目标前 SPIN_THRESHOLD 秒再忙等，帧间隔更稳定但更耗电。
+    fps_limit 为0时不限帧（垂直同步时由显示器控制）。
+    """
+
+    def __init__(self, fps_limit: int = 60, history: int = 240, spin: bool = False):
+        self.period = 1.0 / fps_limit if fps_limit > 0 else 0.0
+        self.spin = spin
+        self.frame_times = deque(maxlen=history)
+        self.last = time.perf_counter()
+        self.deadline = self.last + self.period
+
+    def tick(self) -> float:
+        """等待到下一帧的开始时间，返回刚结束的这一帧的实际时长（秒）"""
+        if self.period:
+            now = time.perf_counter()
+            if now > self.deadline + self.period:
+                # 落后超过一帧（例如加载或窗口拖动），从现在重新对齐，避免之后连续不等待地追帧
+                self.deadline = now
+            else:
+                remaining = self.deadline - now
+                if self.spin:
+                    if remaining > SPIN_THRESHOLD:
+                        time.sleep(remaining - SPIN_THRESHOLD)
+                    while time.perf_counter() < self.deadline:
+                        pass
+                elif remaining > 0:
+                    time.sleep(remaining)
+            self.deadline += self.period
+        now = time.perf_counter()
+        frame_time = now - self.last
+        self.last = now
+        self.frame_times.append(frame_time)
+        return frame_time
+
+    def stats(self) -> FrameStats:
+        """最近帧的帧率和帧时间统计"""
+        if not self.frame_times:
+            return FrameStats(0.0, 0.0, 0.0, 0.0, 0.0)
+        times = sorted(self.frame_times)
+        mean = sum(times) / len(times)
+        variance = sum((t - mean) ** 2 for t in times) / len(times)
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        return FrameStats(1.0 / mean if mean else 0.0, mean * 1000, p99 * 1000, times[-1] * 1000,
+                          variance ** 0.5 * 1000)
@@ -1,14 +1,39 @@
 from typing import List, Tuple, Optional
 import random
-from card import Card
+from card import Card, CARD_POOL, card_from_id
 from pile import Pile
 from player import Player
 from config import MAX_HEALTH
+from events import EventEmitter, SETTLEMENT_RESOLVED
+from state import GameState
+from zobrist import game_hash
+from settlement import SettlementPreview, resolve
+from actions import (ACTION_COUNT, MAX_MOVE_CARDS, EMPTY_TOP_VALUE, MOVE, decode_action,
+                     move_action, settle_action, OP_MOVE, OP_SETTLE, OP_BEGIN_SETTLEMENT,
+                     OP_RESOLVE_SETTLEMENT, OP_PENALTY)
+
+# 规则版本，规则改变导致同一操作序列结果不同时递增（录像和存档据此判断能否重放）
+RULESET_VERSION = 1
+
+# 撤销日志的记录类型
+JOURNAL_MOVE = 'move'
+JOURNAL_SETTLE = 'settle'
+JOURNAL_SETTLEMENT = 'settlement'
+JOURNAL_BEGIN_SETTLEMENT = 'begin_settlement'
+JOURNAL_RESOLVE_SETTLEMENT = 'resolve_settlement'
+JOURNAL_PENALTY = 'penalty'
 
 class Game:
-    def __init__(self):
-        self.player = Player(max_hp=MAX_HEALTH)
-        self.piles = [Pile() for _ in range(6)]  # 6个牌堆
+    def __init__(self, seed: Optional[int] = None):
+        # 每局独立的随机数生成器（发牌和诅咒卡回流），相同seed可完整复现一局
+        # 未指定时随机选一个32位种子，保证每局都可以录像重放
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.events = EventEmitter()  # 领域事件，界面和音效层通过订阅响应
+        self.player = Player(max_hp=MAX_HEALTH, events=self.events)
+        self.piles = [Pile(self.events) for _ in range(6)]  # 6个牌堆
         self.active_curse = None  # 当前激活的诅咒卡
         self.defense_cards = []  # 防御卡
         self.attack_cards = []   # 攻击卡
@@ -16,31 +41,144 @@ class Game:
         self.removed_by_defense = []  # 被防御消灭的诅咒卡
         self.removed_by_attack = []   # 被攻击消灭的诅咒卡
         self.destroyed_curse_total = 0  # 被消灭的诅咒牌数值总和
+        self.journal: Optional[list] = None  # 撤销日志，调用 start_journal() 后开始记录
+        self.returned_curse_count = 0  # 累计返回牌堆的诅咒卡数量（也就是随机数生成器已抽取的次数）
+        # 操作记录回调 recorder(op, *args)，每次成功的操作调用一次（操作码见 actions.py）
+        self.recorder = None
+        # 界面两阶段结算中已移出牌堆、等待结算的卡牌：(from_pile, start_card_index, cards)
+        self.pending_settlement: Optional[Tuple[int, int, List[Card]]] = None
+
+        # 合法动作缓存：按牌堆版本号增量更新
+        self._action_mask = 0
+        self._action_versions = [-1] * len(self.piles)
+        self._top_values = [EMPTY_TOP_VALUE] * len(self.piles)  # 各牌堆顶部明牌数值
+        self._source_values = [[] for _ in self.piles]  # 各牌堆拖动1-5张时最底下那张的数值
         
         # 初始化游戏
         self.initialize_game()
         
     def initialize_game(self):
         """初始化游戏"""
-        # 创建52张卡牌，数值范围1-16，类型随机
-        card_types = ['attack', 'defense', 'curse', 'heal']
+        # 从共享卡牌表中随机抽取52张（类型和数值均匀随机，抽取本身即为随机顺序）
         total_cards = 52
-        all_cards = []
-        for _ in range(total_cards):
-            card_type = random.choice(card_types)
-            value = random.randint(1, 16)
-            card = Card(card_type, value, face_up=False)
-            all_cards.append(card)
-        random.shuffle(all_cards)
+        all_cards = [CARD_POOL[self.rng.randrange(len(CARD_POOL))] for _ in range(total_cards)]
+        self._deal(all_cards)
+
+    def _deal(self, all_cards: List[Card]):
+        """按发牌顺序把卡牌分到各牌堆并开局翻牌"""
         # 初始牌堆分布 [9,9,8,8,9,9]
         pile_counts = [9, 9, 8, 8, 9, 9]
         idx = 0
         for pile, count in zip(self.piles, pile_counts):
+            pile.reset([], 0)
             for _ in range(count):
-                pile.add_card(all_cards[idx])
+                pile.add_card(all_cards[idx], face_up=False)
                 idx += 1
             pile.first_flip()
 
+    @classmethod
+    def from_deal(cls, deal, seed: Optional[int] = None) -> 'Game':
+        """用给定的发牌结果（52个卡牌 id，见 dealer.py）创建牌局
+
+        随机数生成器的状态与 Game(seed) 发完牌之后相同，因此 deal 来自
+        dealer.deals_from_seeds([seed]) 时得到的牌局与 Game(seed) 完全一致。
+        """
+        game = cls(seed)
+        game._deal([card_from_id(int(card_id)) for card_id in deal])
+        return game
+
+    def get_rng_state(self) -> tuple:
+        """获取随机数生成器的状态快照"""
+        return self.rng.getstate()
+
+    def set_rng_state(self, rng_state: tuple):
+        """恢复随机数生成器的状态"""
+        self.rng.setstate(rng_state)
+
+    def fork_rng(self) -> random.Random:
+        """复制一份当前状态的随机数生成器，之后与本局互不影响"""
+        forked = random.Random()
+        forked.setstate(self.rng.getstate())
+        return forked
+
+    def rebuild_rng(self, returned_curse_count: int):
+        """按种子和诅咒卡回流次数重建随机数生成器（它只用于发牌和诅咒卡回流）"""
+        rng = random.Random(self.seed)
+        for _ in range(52):
+            rng.randrange(len(CARD_POOL))
+        for _ in range(returned_curse_count):
+            rng.randrange(len(self.piles))
+        self.rng = rng
+        self.returned_curse_count = returned_curse_count
+
+    def start_journal(self):
+        """开始记录可撤销的操作（move_cards、settle、add_to_settlement）"""
+        self.journal = []
+
+    def stop_journal(self):
+        """停止记录并清空撤销日志"""
+        self.journal = None
+
+    def undo(self) -> bool:
+        """撤销最近一次记录的操作，精确恢复之前的状态（包括随机数生成器）"""
+        if not self.journal:
+            return False
+        entry = self.journal.pop()
+        kind = entry[0]
+        if kind == JOURNAL_MOVE:
+            _, from_pile, to_pile, start_card_index, count, flipped = entry
+            source_pile = self.piles[from_pile]
+            target_pile = self.piles[to_pile]
+            if flipped:
+                source_pile.unflip_top_card()
+            top = target_pile.face_up_count
+            source_pile.insert_face_up(start_card_index, target_pile.remove_face_up(top - count, top))
+        elif kind == JOURNAL_SETTLE:
+            _, from_pile, start_card_index, cards, flipped = entry
+            pile = self.piles[from_pile]
+            if flipped:
+                pile.unflip_top_card()
+            # 先撤销内部的结算记录，再把卡牌放回牌堆
+            self.undo()
+            pile.insert_face_up(start_card_index, cards)
+        elif kind == JOURNAL_BEGIN_SETTLEMENT:
+            _, from_pile, start_card_index, cards = entry
+            self.piles[from_pile].insert_face_up(start_card_index, cards)
+            self.pending_settlement = None
+        elif kind == JOURNAL_RESOLVE_SETTLEMENT:
+            _, from_pile, start_card_index, cards, flipped = entry
+            if flipped:
+                self.piles[from_pile].unflip_top_card()
+            self.undo()
+            self.pending_settlement = (from_pile, start_card_index, cards)
+        elif kind == JOURNAL_PENALTY:
+            self.player.hp = entry[1]
+        else:
+            _, hp, destroyed_curse_total, settlement_area, defense_count, attack_count, rng_state, returned = entry
+            for pile_index in reversed(returned):
+                self.piles[pile_index].remove_bottom()
+            self.returned_curse_count -= len(returned)
+            self.player.hp = hp
+            self.destroyed_curse_total = destroyed_curse_total
+            self.settlement_area = settlement_area
+            del self.removed_by_defense[defense_count:]
+            del self.removed_by_attack[attack_count:]
+            if rng_state is not None:
+                self.rng.setstate(rng_state)
+        return True
+
+    def zobrist_hash(self) -> int:
+        """整局的64位哈希（牌堆内容、明暗分界、生命值和结算区），用于置换表"""
+        return game_hash(self)
+
+    def get_state(self) -> GameState:
+        """导出紧凑的对局状态（用于搜索和模拟时快速复制）"""
+        return GameState.from_game(self)
+
+    def set_state(self, state: GameState):
+        """恢复到指定的对局状态"""
+        state.apply_to(self)
+
     def move_cards(self, from_pile: int, to_pile: int, start_card_index: int) -> Tuple[bool, str]:
         """移动一组卡牌"""
         if not (0 <= from_pile < len(self.piles) and 0 <= to_pile < len(self.piles)):
@@ -50,50 +188,213 @@ class Game:
         target_pile = self.piles[to_pile]
         
         # 检查起始索引是否有效
-        if start_card_index >= len(source_pile.face_up_cards):
+        face_up_count = source_pile.face_up_count
+        if not 0 <= start_card_index < face_up_count:
             return False, "Invalid card index"
             
         # 计算要移动的卡牌数量（最多5张）
-        top_index = len(source_pile.face_up_cards) - 1
-        cards_to_move = source_pile.face_up_cards[start_card_index:min(start_card_index + 5, top_index + 1)]
+        end_index = min(start_card_index + 5, face_up_count)
+        cards_to_move = source_pile.peek_face_up(start_card_index, end_index)
         
         # 检查移动是否合法
         if not self.is_valid_move(cards_to_move, target_pile):
             return False, "Invalid move"
             
-        # 执行移动
-        for card in cards_to_move:
-            source_pile.remove_card(source_pile.cards.index(card))
-            target_pile.add_card(card)
+        # 执行移动（整段切片移动）
+        target_pile.add_cards(source_pile.remove_face_up(start_card_index, end_index))
         
         # 如果源牌堆还有卡牌，翻开顶部卡牌
-        if source_pile.cards and not source_pile.face_up_cards:
-            source_pile.flip_top_card()
+        flipped = source_pile.flip_top_card()
+        if self.journal is not None:
+            self.journal.append((JOURNAL_MOVE, from_pile, to_pile, start_card_index,
+                                 end_index - start_card_index, flipped))
+        if self.recorder is not None:
+            if end_index == face_up_count:
+                self.recorder(move_action(from_pile, to_pile, end_index - start_card_index))
+            else:
+                self.recorder(OP_MOVE, from_pile, to_pile, start_card_index)
             
         return True, "Move successful"
         
     def is_valid_move(self, cards: List[Card], target_pile: Pile) -> bool:
         """检查移动是否合法"""
         # 如果目标牌堆为空，可以移动
-        if not target_pile.face_up_cards:
+        target_card = target_pile.top_card()
+        if target_card is None:
             return True
             
         # 获取源卡牌和目标牌堆顶部卡牌的值
         source_value = cards[0].value
-        target_value = target_pile.face_up_cards[-1].value
+        target_value = target_card.value
         
         # 只能移动到数值更大的牌堆
         return source_value < target_value
         
+    def settle(self, from_pile: int, start_card_index: int) -> Tuple[bool, str]:
+        """将牌堆中从 start_card_index 开始的明牌拖入结算区并立即结算"""
+        if not 0 <= from_pile < len(self.piles):
+            return False, "Invalid pile index"
+        pile = self.piles[from_pile]
+        face_up_count = pile.face_up_count
+        if not 0 <= start_card_index < face_up_count:
+            return False, "Invalid card index"
+        if self.recorder is not None:
+            size = face_up_count - start_card_index
+            if size <= MAX_MOVE_CARDS:
+                self.recorder(settle_action(from_pile, size))
+            else:
+                self.recorder(OP_SETTLE, from_pile, start_card_index)
+        cards = pile.remove_face_up(start_card_index, face_up_count)
+        result = self.add_to_settlement(cards)
+        # 结算后自动翻开顶部暗牌
+        flipped = pile.flip_top_card()
+        if self.journal is not None:
+            self.journal.append((JOURNAL_SETTLE, from_pile, start_card_index, cards, flipped))
+        return result
+
+    def begin_settlement(self, from_pile: int, start_card_index: int) -> Tuple[bool, str]:
+        """两阶段结算的第一步：把卡牌移出牌堆等待结算（界面展示期间仍可移动其他卡牌）"""
+        if self.pending_settlement is not None:
+            return False, "Settlement in progress"
+        if not 0 <= from_pile < len(self.piles):
+            return False, "Invalid pile index"
+        pile = self.piles[from_pile]
+        if not 0 <= start_card_index < pile.face_up_count:
+            return False, "Invalid card index"
+        cards = pile.remove_face_up(start_card_index, pile.face_up_count)
+        self.pending_settlement = (from_pile, start_card_index, cards)
+        if self.journal is not None:
+            self.journal.append((JOURNAL_BEGIN_SETTLEMENT, from_pile, start_card_index, cards))
+        if self.recorder is not None:
+            self.recorder(OP_BEGIN_SETTLEMENT, from_pile, start_card_index)
+        return True, "Settlement started"
+
+    def resolve_settlement(self) -> Tuple[bool, str]:
+        """两阶段结算的第二步：结算等待中的卡牌，并在需要时翻开源牌堆顶部暗牌"""
+        if self.pending_settlement is None:
+            return False, "No pending settlement"
+        if self.recorder is not None:
+            self.recorder(OP_RESOLVE_SETTLEMENT)
+        from_pile, start_card_index, cards = self.pending_settlement
+        self.pending_settlement = None
+        result = self.add_to_settlement(cards)
+        flipped = self.piles[from_pile].flip_top_card()
+        if self.journal is not None:
+            self.journal.append((JOURNAL_RESOLVE_SETTLEMENT, from_pile, start_card_index, cards, flipped))
+        return result
+
+    def apply_penalty(self, amount: int):
+        """难度惩罚：直接扣血"""
+        if self.journal is not None:
+            self.journal.append((JOURNAL_PENALTY, self.player.hp))
+        if self.recorder is not None:
+            self.recorder(OP_PENALTY, amount)
+        self.player.take_damage(amount)
+
+    def preview_settlement(self, from_pile: int, from_index: int) -> Optional[SettlementPreview]:
+        """预览把牌堆中从 from_index 开始的明牌拖入结算区的结果，不修改局面和随机数生成器
+
+        索引无效时返回 None。
+        """
+        if not 0 <= from_pile < len(self.piles):
+            return None
+        pile = self.piles[from_pile]
+        face_up_count = pile.face_up_count
+        if not 0 <= from_index < face_up_count:
+            return None
+        defense = attack = heal = new_curse = new_curse_count = 0
+        curse_values = None
+        for i in range(from_index, face_up_count):
+            card = pile.face_up_card(i)
+            if card.type == 'curse':
+                new_curse += card.value
+                new_curse_count += 1
+                if curse_values is None:
+                    curse_values = [c.value for c in self.settlement_area if c.type == 'curse']
+                curse_values.append(card.value)
+            elif card.type == 'defense':
+                defense += card.value
+            elif card.type == 'attack':
+                attack += card.value
+            elif card.type == 'heal':
+                heal += card.value
+        by_defense = by_attack = returned = attack_used = damage = 0
+        if defense or attack:
+            if curse_values is None:
+                curse_values = [c.value for c in self.settlement_area if c.type == 'curse']
+            if curse_values:
+                outcome = resolve(tuple(sorted(curse_values)), defense, attack)
+                by_defense, by_attack, attack_used, damage = outcome
+                returned = len(curse_values) - outcome.destroyed
+        elif curse_values is not None:
+            # 只拖入诅咒牌：本次拖入的全部返回
+            returned = new_curse_count
+            damage = new_curse
+        hp = max(0, self.player.hp - damage) if damage else self.player.hp
+        healed = min(self.player.max_hp, hp + heal) - hp if heal else 0
+        return SettlementPreview(damage, by_defense, by_attack, returned, attack_used, healed, hp + healed)
+
+    def apply_action(self, action: int) -> Tuple[bool, str]:
+        """执行一个编码后的动作（编码见 actions.py），动作编号超出范围时抛出 ValueError"""
+        if not 0 <= action < ACTION_COUNT:
+            raise ValueError(f"动作编号 {action} 超出范围 [0, {ACTION_COUNT})")
+        kind, from_pile, to_pile, size = decode_action(action)
+        if kind == MOVE and from_pile == to_pile:
+            # 与 legal_actions 一致：移动到自身不是合法动作
+            return False, "Cannot move to the same pile"
+        start_card_index = self.piles[from_pile].face_up_count - size
+        if start_card_index < 0:
+            return False, "Invalid card index"
+        if kind == MOVE:
+            return self.move_cards(from_pile, to_pile, start_card_index)
+        return self.settle(from_pile, start_card_index)
+
+    def legal_actions(self) -> int:
+        """返回所有合法动作的位掩码，第 i 位为1表示动作 i 合法
+
+        只重新计算自上次调用以来发生变化的牌堆所在的行和列。
+        """
+        changed = [i for i, pile in enumerate(self.piles) if pile.version != self._action_versions[i]]
+        if not changed:
+            return self._action_mask
+        for i in changed:
+            pile = self.piles[i]
+            self._action_versions[i] = pile.version
+            face_up_count = pile.face_up_count
+            top = pile.top_card()
+            self._top_values[i] = top.value if top else EMPTY_TOP_VALUE
+            self._source_values[i] = [pile.face_up_card(face_up_count - size).value
+                                      for size in range(1, min(face_up_count, MAX_MOVE_CARDS) + 1)]
+        for i in changed:
+            for other in range(len(self.piles)):
+                if other != i:
+                    self._update_move_bits(i, other)
+                    self._update_move_bits(other, i)
+            size_bits = (1 << len(self._source_values[i])) - 1
+            self._set_action_bits(settle_action(i, 1), size_bits)
+        return self._action_mask
+
+    def _update_move_bits(self, from_pile: int, to_pile: int):
+        target_value = self._top_values[to_pile]
+        size_bits = 0
+        for size_index, value in enumerate(self._source_values[from_pile]):
+            if value < target_value:
+                size_bits |= 1 << size_index
+        self._set_action_bits(move_action(from_pile, to_pile, 1), size_bits)
+
+    def _set_action_bits(self, shift: int, size_bits: int):
+        field = ((1 << MAX_MOVE_CARDS) - 1) << shift
+        self._action_mask = (self._action_mask & ~field) | (size_bits << shift)
+
     def check_game_over(self) -> bool:
         """检查游戏是否结束"""
         return not self.player.is_alive()
         
     def check_win_condition(self) -> bool:
         """检查是否满足胜利条件：牌堆中没有诅咒牌"""
-        # 检查所有牌堆中是否有诅咒牌
+        # 各牌堆实时维护诅咒牌数量，无需遍历卡牌
         for pile in self.piles:
-            if any(card.type == 'curse' for card in pile.cards):
+            if pile.curse_count:
                 return False
         return True
 
@@ -104,62 +405,40 @@ class Game:
 
         # 统计本次拖入的诅咒卡、攻击卡、防御卡
         curse_cards = [c for c in cards if c.type == 'curse']
-        attack_cards = [c for c in cards if c.type == 'attack']
-        defense_cards = [c for c in cards if c.type == 'defense']
+        defense = sum(c.value for c in cards if c.type == 'defense')
+        attack = sum(c.value for c in cards if c.type == 'attack')
         other_cards = [c for c in cards if c.type not in ('curse', 'attack', 'defense')]
         msg_list = []
+        entry = None
+        if self.journal is not None:
+            entry = [JOURNAL_SETTLEMENT, self.player.hp, self.destroyed_curse_total, list(self.settlement_area),
+                     len(self.removed_by_defense), len(self.removed_by_attack), None, []]
 
         # 1. 处理诅咒卡：加入结算区
         if curse_cards:
             self.settlement_area.extend(curse_cards)
             msg_list.append(f"拖入{len(curse_cards)}张诅咒卡，等待结算。")
 
-        # 2. 处理防御+攻击卡（与结算区已有诅咒卡互动）
-        exist_curse = [c for c in self.settlement_area if c.type == 'curse']
-        if defense_cards or attack_cards:
-            remain_curse_cards = sorted(exist_curse, key=lambda x: x.value)
-            removed_by_defense = []
-            removed_by_attack = []
-            returned_curse = []
-            remain_defense = sum(c.value for c in defense_cards)
-            remain_attack = sum(c.value for c in attack_cards)
-            # 先用防御抵消诅咒卡
-            for curse in remain_curse_cards:
-                if remain_defense >= curse.value:
-                    remain_defense -= curse.value
-                    removed_by_defense.append(curse)
-                else:
-                    break
-            # 更新剩余未被防御抵消的诅咒卡
-            remain_curse_cards = [c for c in remain_curse_cards if c not in removed_by_defense]
-            # 再用攻击消灭诅咒卡
-            attack_used = 0  # 新增：本次攻击实际抵消的诅咒数值
-            for curse in remain_curse_cards:
-                if remain_attack >= curse.value:
-                    remain_attack -= curse.value
-                    removed_by_attack.append(curse)
-                    attack_used += curse.value
-                else:
-                    if remain_attack > 0:
-                        attack_used += remain_attack
-                        # 只抵消部分，剩余部分返还
-                        returned_curse.append(curse)
-                        remain_attack = 0
-                    else:
-                        returned_curse.append(curse)
+        # 2. 处理防御+攻击卡（与结算区已有诅咒卡互动），结果查结算表得到
+        if defense or attack:
+            # 同数值的诅咒卡是同一个共享实例，按数值排序即可确定各部分
+            remain_curse_cards = sorted((c for c in self.settlement_area if c.type == 'curse'),
+                                        key=lambda x: x.value)
+            outcome = resolve(tuple(c.value for c in remain_curse_cards), defense, attack)
+            removed_by_defense = remain_curse_cards[:outcome.by_defense]
+            removed_by_attack = remain_curse_cards[outcome.by_defense:outcome.destroyed]
+            returned_curse = remain_curse_cards[outcome.destroyed:]
             # 更新结算区，移除被消灭和返回的诅咒卡
             self.settlement_area = [c for c in self.settlement_area if c.type != 'curse']
             # 更新被消灭的诅咒卡列表
             self.removed_by_defense.extend(removed_by_defense)
             self.removed_by_attack.extend(removed_by_attack)
             # 更新被消灭的诅咒牌总数（数值总和，包含部分抵消）
-            self.destroyed_curse_total += attack_used
+            self.destroyed_curse_total += outcome.attack_used
             # --- 修改：返回的诅咒卡放入随机牌堆底部 ---
-            for curse in returned_curse:
-                random_pile = random.choice(self.piles)
-                random_pile.add_card_to_bottom(curse)
+            self._return_curses(returned_curse, entry)
             # 玩家只扣未被抵消/消灭的诅咒牌的总和
-            total_damage = sum(c.value for c in returned_curse)
+            total_damage = outcome.damage
             if removed_by_defense:
                 msg_list.append(f"防御成功抵消{len(removed_by_defense)}张诅咒卡。")
             if removed_by_attack:
@@ -176,9 +455,7 @@ class Game:
         elif curse_cards:
             # 只拖入诅咒牌，全部返回随机牌堆底部并扣血
             total_damage = sum(c.value for c in curse_cards)
-            for curse in curse_cards:
-                random_pile = random.choice(self.piles)
-                random_pile.add_card_to_bottom(curse)
+            self._return_curses(curse_cards, entry)
             self.settlement_area = [c for c in self.settlement_area if c.type != 'curse']
             if total_damage > 0:
                 self.player.take_damage(total_damage)
@@ -189,9 +466,24 @@ class Game:
                 self.player.heal(card.value)
                 msg_list.append(f"治疗{card.value}点生命值。")
         if msg_list:
-            return True, ' '.join(msg_list)
+            result = (True, ' '.join(msg_list))
         else:
-            return False, "未产生结算效果。"
+            result = (False, "未产生结算效果。")
+        if entry is not None:
+            self.journal.append(tuple(entry))
+        self.events.emit(SETTLEMENT_RESOLVED, success=result[0], message=result[1])
+        return result
+
+    def _return_curses(self, curses: List[Card], entry: Optional[list]):
+        """将诅咒卡正面朝上放回随机牌堆（明牌部分最前面），需要时记录到撤销日志"""
+        if entry is not None and curses:
+            entry[6] = self.rng.getstate()
+        self.returned_curse_count += len(curses)
+        for curse in curses:
+            pile_index = self.rng.randrange(len(self.piles))
+            self.piles[pile_index].add_card_to_bottom(curse)
+            if entry is not None:
+                entry[7].append(pile_index)
 
     def get_total_curse_value(self, include_removed: bool = False) -> int:
         """统计诅咒牌的数值总和
@@ -199,9 +491,5 @@ class Game:
         Args:
             include_removed: 是否包括被消灭的诅咒卡（默认False）
         """
-        total = 0
-        # 统计牌堆中的诅咒卡
-        for pile in self.piles:
-            total += sum(card.value for card in pile.cards if card.type == 'curse')
-        return total
-
+        # 各牌堆实时维护诅咒牌数值总和
+        return sum(pile.curse_value for pile in self.piles)
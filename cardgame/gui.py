@@ -1,16 +1,51 @@
 import pygame
 import sys
 import os
-import time
 import math
 from config import *
-from typing import Tuple, Optional, Dict
+from typing import Tuple, Optional, Dict, List
 from game import Game
 from card import Card
 from config import UI_IMAGES, BLOOD_MOVE_RANGE, HEAD_MOVE_X, HEAD_MOVE_Y, DESTROYED_CURSE_TEXT_POS
 from rule.difficulty import DifficultyMenu
 from rule.modal_popup import ModalPopup
 from music_handler import music_handler
+from font_handler import font_handler, OUTLINE_WIDTH
+from frame_pacer import FramePacer
+from events import DAMAGE_TAKEN, HEALED
+from autosave import AutoSaver
+from card_atlas import CardAtlas
+
+
+# 预先合成到背景上的静态UI图层（按绘制顺序）
+STATIC_UI_LAYERS = ("back", "settlement", "front")
+
+# 图层中的一次绘制：(Surface, 左上角位置)
+Blit = Tuple[pygame.Surface, Tuple[int, int]]
+
+
+def changed_rects(previous: Dict[object, List[Blit]], layers: Dict[object, List[Blit]],
+                  bounds: pygame.Rect) -> List[pygame.Rect]:
+    """比较两帧的图层，返回需要重绘的矩形（内容变化的图层的新旧范围，重叠的矩形合并）
+
+    图层中的 Surface 来自图集和缓存，内容不变时是同一个对象，按对象和位置比较即可。
+    """
+    rects = []
+    for key in previous.keys() | layers.keys():
+        old, new = previous.get(key, []), layers.get(key, [])
+        if old != new:
+            for surface, pos in old + new:
+                rect = surface.get_rect(topleft=pos).clip(bounds)
+                if rect.width and rect.height:
+                    rects.append(rect)
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
 
 
 # 资源管理类
@@ -136,7 +171,15 @@ class GameGUI:
         self.game = game
         self.screen_width = screen_width
         self.screen_height = screen_height
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+        # 垂直同步需要 SCALED 模式（由渲染器提交画面），不支持时退回普通窗口
+        self.vsync = VSYNC
+        try:
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height),
+                                                  pygame.SCALED if self.vsync else 0, vsync=int(self.vsync))
+        except pygame.error as e:
+            print(f"开启垂直同步失败: {e}")
+            self.vsync = False
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         pygame.display.set_caption("Card Game")
         try:
             icon = pygame.image.load(back_card)
@@ -144,7 +187,8 @@ class GameGUI:
         except Exception as e:
             print(f"设置窗口图标失败: {e}")
         pygame.display.set_caption("52yoru")
-        self.clock = pygame.time.Clock()
+        # 逻辑时间（秒），由固定步长的 update 推进，驱动头像动画
+        self.animation_time = 0.0
         # 难度相关
         self.difficulty = difficulty
         self.move_limit = 3
@@ -214,13 +258,32 @@ class GameGUI:
         self.effect_duration = effect_duration  # 效果持续时间（毫秒）
         
         # 结算区相关
-        self.settlement_display_timer = 0
+        self.settlement_elapsed = 0.0  # 展示已持续的逻辑时间（秒），由固定步长的 update 累加
         self.settlement_display_cards = []
         self.settlement_display_from_pile = None
+        # 读档时恢复等待中的结算，重新开始展示计时
+        if self.game.pending_settlement is not None:
+            from_pile, from_index, cards = self.game.pending_settlement
+            self.settlement_display_cards = list(cards)
+            self.settlement_elapsed = 0.0
+            self.settlement_display_from_pile = (from_pile, from_index)
         
+        # 订阅规则引擎事件，播放对应音效
+        self.game.events.subscribe(DAMAGE_TAKEN, self.on_hp_changed)
+        self.game.events.subscribe(HEALED, self.on_hp_changed)
+
         # 初始化界面
         self.initialize_gui()
 
+    def on_hp_changed(self, amount: int, hp: int):
+        """受伤或治疗时播放音效"""
+        music_handler.play_sound("assets/music/health.mp3")
+
+    def save_game(self):
+        """回合结束时把自动存档日志压缩为完整存档"""
+        self.autosaver.update(self.move_count, self.last_turn)
+        self.autosaver.compact()
+
     def initialize_gui(self):
         """初始化GUI资源"""
         # 加载背景
@@ -237,6 +300,9 @@ class GameGUI:
             except Exception as e:
                 print(f"加载UI图片失败: {key} - {path}，错误：{e}")
                 self.ui_images[key] = None
+        self.ui_layer_size = None
+        self.previous_layers = None
+        self.build_ui_layers()
 
         # 加载卡牌背面
         self.card_back_img = pygame.image.load(back_card).convert_alpha()
@@ -272,11 +338,52 @@ class GameGUI:
             img = pygame.transform.scale(img, (30, 30))  # 可根据需要调整尺寸
             self.num_images[value] = img
 
+        # 预先渲染用到的各个缩放比例的卡牌图集（牌堆、悬停、结算区展示）
+        self.card_atlases: Dict[float, CardAtlas] = {}
+        for scale in (1.0, self.hover_scale, SETTLEMENT_DISPLAY_SCALE):
+            self.build_card_atlas(scale)
+
+    def build_card_atlas(self, scale: float) -> CardAtlas:
+        """渲染并缓存指定缩放比例的卡牌图集"""
+        type_images = {'attack': self.attack_img, 'defense': self.defense_img,
+                       'curse': self.curse_img, 'heal': self.heal_img}
+        atlas = CardAtlas(type_images, self.card_back_img, self.num_images, scale)
+        self.card_atlases[scale] = atlas
+        return atlas
+
+    def build_ui_layers(self):
+        """按 UI_IMAGES 的比例缩放UI图片，并把静态图层合成为一张背景（加载时和分辨率变化时调用）"""
+        self.ui_layer_size = self.screen.get_size()
+        self.scaled_ui_images = {}
+        for key, info in UI_IMAGES.items():
+            img = self.ui_images.get(key)
+            if img is None:
+                continue
+            scale = info.get("scale", 1.0)
+            # 背景按原尺寸铺满
+            if key != "background" and scale != 1.0:
+                w, h = img.get_width(), img.get_height()
+                img = pygame.transform.smoothscale(img, (int(w*scale), int(h*scale)))
+            self.scaled_ui_images[key] = img
+        # 背景、back、settlement 和 front 都不会变化，合成后每帧只需一次整屏 blit；
+        # front 在动态图层（头像、血瓶）之后还会再画一次，保持原来的遮挡关系
+        # 裁掉透明边缘：动态图层只 blit 可见部分，脏矩形也更小
+        self.ui_sprites = {}
+        for key, img in self.scaled_ui_images.items():
+            bounds = img.get_bounding_rect()
+            x, y = UI_IMAGES[key].get("pos", (0, 0))
+            self.ui_sprites[key] = (img.subsurface(bounds), (x + bounds.x, y + bounds.y))
+        self.ui_composite = pygame.Surface(self.ui_layer_size).convert()
+        self.ui_composite.blit(self.scaled_ui_images.get("background", self.background), (0, 0))
+        for key in STATIC_UI_LAYERS:
+            if key in self.scaled_ui_images:
+                self.ui_composite.blit(self.scaled_ui_images[key], UI_IMAGES[key].get("pos", (0, 0)))
+
     def get_card_rect(self, pile_index: int, card_index: int, margin: int = 10) -> pygame.Rect:
         x = pile_start_x + pile_index * (self.card_width + card_spacing)
         base_y = self.pile_area_y
         pile = self.game.piles[pile_index]
-        hidden_cards_count = len(pile.cards) - len(pile.face_up_cards)
+        hidden_cards_count = pile.hidden_count
         y = base_y + (hidden_cards_count + card_index) * card_spacing
         return pygame.Rect(x + margin, y + margin, self.card_width - 2 * margin, self.card_height - 2 * margin)
 
@@ -287,7 +394,7 @@ class GameGUI:
         """
         x, y = pos
         for pile_index, pile in enumerate(self.game.piles):
-            n = len(pile.face_up_cards)
+            n = pile.face_up_count
             if n == 0:
                 continue
             for card_index in reversed(range(n)):
@@ -309,130 +416,81 @@ class GameGUI:
                             return (pile_index, card_index)
         return None
 
-    def draw_card(self, card: Card, x: int, y: int, scale: float = 1.0, selected: bool = False, face_up: bool = True):
-        """绘制单张卡牌"""
+    def card_surface(self, card: Optional[Card], scale: float = 1.0, face_up: bool = True) -> pygame.Surface:
+        """卡牌在对应缩放比例图集中的牌面（或牌背）"""
+        atlas = self.card_atlases.get(scale) or self.build_card_atlas(scale)
+        return atlas.face(card) if face_up else atlas.back
 
-        # 计算缩放后的尺寸
-        width = int(self.card_width * scale)
-        height = int(self.card_height * scale)
-        
-        # 计算缩放后的位置，保持卡牌左上角不变
-        scaled_x = x
-        scaled_y = y
-        if face_up:
-            if card.type == 'attack':
-                self.screen.blit(self.attack_img, (scaled_x, scaled_y))
-                # 绘制数值图片
-                num_img = self.num_images.get(card.value)
-                if num_img:
-                    offset_x, offset_y = NUM_IMAGE_OFFSET
-                    num_scale = NUM_IMAGE_SCALE * scale
-                    scaled_num_width = int(num_img.get_width() * num_scale)
-                    scaled_num_height = int(num_img.get_height() * num_scale)
-                    scaled_num_img = pygame.transform.smoothscale(num_img, (scaled_num_width, scaled_num_height))
-                    num_x = scaled_x + (width - scaled_num_width) // 2 + int(offset_x * scale)
-                    num_y = scaled_y + int(offset_y * scale)
-                    self.screen.blit(scaled_num_img, (num_x, num_y))
-                return
-            elif card.type == 'defense':
-                self.screen.blit(self.defense_img, (scaled_x, scaled_y))
-                num_img = self.num_images.get(card.value)
-                if num_img:
-                    offset_x, offset_y = NUM_IMAGE_OFFSET
-                    num_scale = NUM_IMAGE_SCALE * scale
-                    scaled_num_width = int(num_img.get_width() * num_scale)
-                    scaled_num_height = int(num_img.get_height() * num_scale)
-                    scaled_num_img = pygame.transform.smoothscale(num_img, (scaled_num_width, scaled_num_height))
-                    num_x = scaled_x + (width - scaled_num_width) // 2 + int(offset_x * scale)
-                    num_y = scaled_y + int(offset_y * scale)
-                    self.screen.blit(scaled_num_img, (num_x, num_y))
-                return
-            elif card.type == 'curse':
-                self.screen.blit(self.curse_img, (scaled_x, scaled_y))
-                num_img = self.num_images.get(card.value)
-                if num_img:
-                    offset_x, offset_y = NUM_IMAGE_OFFSET
-                    num_scale = NUM_IMAGE_SCALE * scale
-                    scaled_num_width = int(num_img.get_width() * num_scale)
-                    scaled_num_height = int(num_img.get_height() * num_scale)
-                    scaled_num_img = pygame.transform.smoothscale(num_img, (scaled_num_width, scaled_num_height))
-                    num_x = scaled_x + (width - scaled_num_width) // 2 + int(offset_x * scale)
-                    num_y = scaled_y + int(offset_y * scale)
-                    self.screen.blit(scaled_num_img, (num_x, num_y))
-                return
-            elif card.type == 'heal':
-                self.screen.blit(self.heal_img, (scaled_x, scaled_y))
-                num_img = self.num_images.get(card.value)
-                if num_img:
-                    offset_x, offset_y = NUM_IMAGE_OFFSET
-                    num_scale = NUM_IMAGE_SCALE * scale
-                    scaled_num_width = int(num_img.get_width() * num_scale)
-                    scaled_num_height = int(num_img.get_height() * num_scale)
-                    scaled_num_img = pygame.transform.smoothscale(num_img, (scaled_num_width, scaled_num_height))
-                    num_x = scaled_x + (width - scaled_num_width) // 2 + int(offset_x * scale)
-                    num_y = scaled_y + int(offset_y * scale)
-                    self.screen.blit(scaled_num_img, (num_x, num_y))
-                return
-
-        if not face_up:
-            if not face_up:
-                # 绘制卡牌背面图片
-                self.screen.blit(self.card_back_img, (scaled_x, scaled_y))
-                return
-            return
+    def draw_card(self, card: Card, x: int, y: int, scale: float = 1.0, selected: bool = False, face_up: bool = True):
+        """绘制单张卡牌（从对应缩放比例的图集中 blit 预先渲染好的牌面）"""
+        self.screen.blit(self.card_surface(card, scale, face_up), (x, y))
 
-    def draw_pile(self, pile_index: int, pile):
-        """绘制牌堆"""
+    def pile_layer(self, pile_index: int, pile) -> List[Blit]:
+        """牌堆图层"""
         x = pile_start_x + pile_index * (self.card_width + card_spacing)  # 增加间距
         y = self.pile_area_y
+        blits = []
 
-        # 绘制牌堆剩余数量
-        remaining_text = self.small_font.render(f"Remaining: {len(pile.cards)}", True, COLORS['BLACK'])
+        # 牌堆剩余数量
+        remaining_text = font_handler.render(f"Remaining: {len(pile)}", 24, COLORS['BLACK'])
         remaining_rect = remaining_text.get_rect(center=(x + self.card_width//2, y - 20))
-        self.screen.blit(remaining_text, remaining_rect)
+        blits.append((remaining_text, remaining_rect.topleft))
 
-        # 先绘制暗牌
-        hidden_cards_count = len(pile.cards) - len(pile.face_up_cards)
+        # 先放暗牌
+        hidden_cards_count = pile.hidden_count
+        back = self.card_surface(None, 1.0, face_up=False)
         for i in range(hidden_cards_count):
-            self.draw_card(None, x, y + i * card_spacing, 1.0, face_up=False)
+            blits.append((back, (x, y + i * card_spacing)))
 
-        # 从底部开始绘制明牌，确保顶部的牌在最上层
-        for i in range(len(pile.face_up_cards)):
+        # 从底部开始放明牌，确保顶部的牌在最上层
+        for i, card in enumerate(pile.face_up_cards):
             # 拖动时跳过正在拖动的牌及其上方的牌
             if self.dragging and self.drag_card and self.drag_card[0] == pile_index:
                 if i >= self.drag_card[1]:
                     continue
-            card = pile.face_up_cards[i]
             card_y = y + (hidden_cards_count + i) * card_spacing
-            self.draw_card(card, x, card_y, 1.0, face_up=True)
+            blits.append((self.card_surface(card), (x, card_y)))
+        return blits
+
+    def dragging_layer(self) -> List[Blit]:
+        """正在拖拽的卡牌图层"""
+        if not (self.dragging and self.drag_card):
+            return []
+        pile_index, start_index = self.drag_card
+        pile = self.game.piles[pile_index]
 
-    def draw_dragging_card(self):
-        """绘制正在拖拽的卡牌"""
-        if self.dragging and self.drag_card:
-            pile_index, start_index = self.drag_card
-            pile = self.game.piles[pile_index]
-            
-            # 计算要绘制的卡牌
-            top_index = len(pile.face_up_cards) - 1
-            cards_to_draw = pile.face_up_cards[start_index:top_index + 1]
-            
-            # 获取鼠标位置
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            base_x = mouse_x - self.drag_offset[0]
-            base_y = mouse_y - self.drag_offset[1]
-            
-            # 绘制选中的卡牌组
-            for i, card in enumerate(cards_to_draw):
-                card_y = base_y + i * card_spacing
-                self.draw_card(card, base_x, card_y, self.hover_scale, True)
+        # 计算要绘制的卡牌
+        cards_to_draw = pile.peek_face_up(start_index, pile.face_up_count)
+
+        # 获取鼠标位置
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        base_x = mouse_x - self.drag_offset[0]
+        base_y = mouse_y - self.drag_offset[1]
+
+        # 选中的卡牌组
+        return [(self.card_surface(card, self.hover_scale), (base_x, base_y + i * card_spacing))
+                for i, card in enumerate(cards_to_draw)]
 
     def draw_bottom_area(self):
         """底部区域不再绘制任何内容"""
         pass
 
-    def draw_settlement_area(self):
-        """绘制结算区域"""
+    def update_settlement(self):
+        """展示时间到后结算（结算后自动翻开顶部暗牌）"""
+        if self.settlement_display_cards and self.settlement_elapsed > SETTLEMENT_DISPLAY_DURATION:
+            self.game.resolve_settlement()
+            # 结算后重置移动次数（新回合）
+            self.move_count = 0
+            self.last_turn += 1
+            self.settlement_display_cards = []
+            self.settlement_elapsed = 0.0
+            self.save_game()
+
+    def settlement_layer(self) -> List[Blit]:
+        """结算区图层"""
         # 不再绘制结算区背景和标题，直接绘制结算区卡牌
+        cards = self.settlement_display_cards or self.game.settlement_area
+        blits = []
         if self.settlement_display_cards:
             # 统计各类型总和
             type_sums = {'attack': 0, 'defense': 0, 'curse': 0, 'heal': 0}
@@ -450,67 +508,23 @@ class GameGUI:
                 ys.append(y)
             center_x = sum(xs)//len(xs)
             min_y = min(ys)
-            # 构造所有有数值的类型的文本surface
-            value_font = pygame.font.SysFont(None, 40)
+            # 构造所有有数值的类型的文本surface（白色描边已合成在缓存的文本中）
             texts = []
             for t in ['attack','defense','curse','heal']:
                 if type_sums[t] > 0:
-                    value_text = str(type_sums[t])
-                    text_surface = value_font.render(value_text, True, color_map[t])
-                    outline_text = value_font.render(value_text, True, (255,255,255))
-                    texts.append((text_surface, outline_text, t))
-            # 横向排列，整体居中
-            total_width = sum(s.get_width() for s,_,_ in texts) + (len(texts)-1)*20
+                    texts.append(font_handler.render(str(type_sums[t]), 40, color_map[t], outline=(255,255,255)))
+            # 横向排列，整体居中（描边不计入宽度）
+            total_width = sum(s.get_width() - 2 * OUTLINE_WIDTH for s in texts) + (len(texts)-1)*20
             start_x = center_x - total_width//2
-            for idx, (text_surface, outline_text, t) in enumerate(texts):
-                text_x = start_x
-                text_y = min_y - 32
-                text_rect = text_surface.get_rect()
-                text_rect.topleft = (text_x, text_y)
-                outline_rect = outline_text.get_rect(topleft=(text_x, text_y))
-                # 白色描边
-                for dx in [-1,0,1]:
-                    for dy in [-1,0,1]:
-                        if dx != 0 or dy != 0:
-                            outline_rect2 = outline_rect.copy()
-                            outline_rect2.x += dx
-                            outline_rect2.y += dy
-                            self.screen.blit(outline_text, outline_rect2)
-                self.screen.blit(text_surface, text_rect)
-                start_x += text_surface.get_width() + 20
-            # 继续绘制卡牌
-            for i, card in enumerate(self.settlement_display_cards):
-                x = self.settlement_area_rect.x + SETTLEMENT_DISPLAY_OFFSET[0] + (i % SETTLEMENT_DISPLAY_COLS) * SETTLEMENT_DISPLAY_X_SPACING
-                y = self.settlement_area_rect.y + SETTLEMENT_DISPLAY_OFFSET[1] + (i // SETTLEMENT_DISPLAY_COLS) * SETTLEMENT_DISPLAY_Y_SPACING
-                self.draw_card(card, x, y, SETTLEMENT_DISPLAY_SCALE)
-            # 展示时立即移除牌堆中的卡牌
-            if self.settlement_display_timer > 0 and not hasattr(self, '_settlement_removed'):
-                from_pile, from_index = self.settlement_display_from_pile
-                pile = self.game.piles[from_pile]
-                for card in self.settlement_display_cards:
-                    if card in pile.cards:
-                        pile.remove_card(pile.cards.index(card))
-                self._settlement_removed = True
-            # 到时后结算
-            if time.time() - self.settlement_display_timer > SETTLEMENT_DISPLAY_DURATION:
-                from_pile, from_index = self.settlement_display_from_pile
-                pile = self.game.piles[from_pile]
-                self.game.add_to_settlement(self.settlement_display_cards)
-                # 结算后自动翻开顶部暗牌
-                if pile.cards and not pile.face_up_cards:
-                    pile.flip_top_card()
-                # 结算后重置移动次数（新回合）
-                self.move_count = 0
-                self.last_turn += 1
-                self.settlement_display_cards = []
-                self.settlement_display_timer = 0
-                if hasattr(self, '_settlement_removed'):
-                    del self._settlement_removed
-        else:
-            for i, card in enumerate(self.game.settlement_area):
-                x = self.settlement_area_rect.x + SETTLEMENT_DISPLAY_OFFSET[0] + (i % SETTLEMENT_DISPLAY_COLS) * SETTLEMENT_DISPLAY_X_SPACING
-                y = self.settlement_area_rect.y + SETTLEMENT_DISPLAY_OFFSET[1] + (i // SETTLEMENT_DISPLAY_COLS) * SETTLEMENT_DISPLAY_Y_SPACING
-                self.draw_card(card, x, y, SETTLEMENT_DISPLAY_SCALE)
+            for text_surface in texts:
+                blits.append((text_surface, (start_x - OUTLINE_WIDTH, min_y - 32 - OUTLINE_WIDTH)))
+                start_x += text_surface.get_width() - 2 * OUTLINE_WIDTH + 20
+        # 卡牌
+        for i, card in enumerate(cards):
+            x = self.settlement_area_rect.x + SETTLEMENT_DISPLAY_OFFSET[0] + (i % SETTLEMENT_DISPLAY_COLS) * SETTLEMENT_DISPLAY_X_SPACING
+            y = self.settlement_area_rect.y + SETTLEMENT_DISPLAY_OFFSET[1] + (i // SETTLEMENT_DISPLAY_COLS) * SETTLEMENT_DISPLAY_Y_SPACING
+            blits.append((self.card_surface(card, SETTLEMENT_DISPLAY_SCALE), (x, y)))
+        return blits
 
     def add_effect(self, effect_type: str, value: int, position: Tuple[int, int]):
         """添加视觉效果"""
@@ -522,105 +536,97 @@ class GameGUI:
             'alpha': 255
         })
 
-    def draw(self):
-        """绘制整个游戏界面"""
-        # 1. 绘制背景和UI图片
-        if self.ui_images.get("background"):
-            self.screen.blit(self.ui_images["background"], (0, 0))
-        else:
-            self.screen.blit(self.background, (0, 0))
-        for key, info in UI_IMAGES.items():
-            if key in ("background", "blood", "bottleBack", "bottlefront"):
-                continue
-            img = self.ui_images.get(key)
-            if img:
-                pos = list(info.get("pos", (0, 0)))
-                scale = info.get("scale", 1.0)
-                # headL和headR动态运动
-                if key in ("headL", "headR"):
-                    t = pygame.time.get_ticks() / 1000.0
-                    if key == "headL":
-                        dx = int(HEAD_MOVE_X * math.sin(t))
-                        dy = int(HEAD_MOVE_Y * math.cos(t))
-                    else:
-                        dx = int(HEAD_MOVE_X * math.sin(t + math.pi))
-                        dy = int(HEAD_MOVE_Y * math.cos(t + math.pi))
-                    pos[0] += dx
-                    pos[1] += dy
-                if scale != 1.0:
-                    w, h = img.get_width(), img.get_height()
-                    img = pygame.transform.smoothscale(img, (int(w*scale), int(h*scale)))
-                self.screen.blit(img, pos)
-        if "bottleBack" in self.ui_images and self.ui_images["bottleBack"]:
-            info = UI_IMAGES["bottleBack"]
-            img = self.ui_images["bottleBack"]
-            pos = info.get("pos", (0, 0))
-            scale = info.get("scale", 1.0)
-            if scale != 1.0:
-                w, h = img.get_width(), img.get_height()
-                img = pygame.transform.smoothscale(img, (int(w*scale), int(h*scale)))
-            self.screen.blit(img, pos)
-        if "blood" in self.ui_images and self.ui_images["blood"]:
-            blood_img = self.ui_images["blood"]
-            info = UI_IMAGES["blood"]
-            base_x, base_y = info["pos"]
-            scale = info.get("scale", 1.0)
-            if scale != 1.0:
-                w, h = blood_img.get_width(), blood_img.get_height()
-                blood_img = pygame.transform.smoothscale(blood_img, (int(w*scale), int(h*scale)))
+    def build_layers(self) -> Dict[object, List[Blit]]:
+        """按绘制顺序生成背景合成图之上的全部图层，每个图层是 (Surface, 位置) 列表"""
+        layers: Dict[object, List[Blit]] = {}
+        # 1. UI图片：headL和headR动态运动，血瓶中的血量随生命值下移
+        t = self.animation_time
+        for key, phase in (("headL", 0), ("headR", math.pi)):
+            sprite = self.ui_sprites.get(key)
+            if sprite:
+                img, (x, y) = sprite
+                dx = int(HEAD_MOVE_X * math.sin(t + phase))
+                dy = int(HEAD_MOVE_Y * math.cos(t + phase))
+                layers[key] = [(img, (x + dx, y + dy))]
+        bottle = []
+        if self.ui_sprites.get("bottleBack"):
+            bottle.append(self.ui_sprites["bottleBack"])
+        if self.ui_sprites.get("blood"):
+            img, (x, y) = self.ui_sprites["blood"]
             hp = self.game.player.hp
             max_hp = self.game.player.max_hp
             move_offset = int((1 - hp / max_hp) * BLOOD_MOVE_RANGE)
-            blood_rect = blood_img.get_rect()
-            blood_rect.topleft = (base_x, base_y + move_offset)
-            self.screen.blit(blood_img, blood_rect)
-        if "bottlefront" in self.ui_images and self.ui_images["bottlefront"]:
-            info = UI_IMAGES["bottlefront"]
-            img = self.ui_images["bottlefront"]
-            pos = info.get("pos", (0, 0))
-            scale = info.get("scale", 1.0)
-            if scale != 1.0:
-                w, h = img.get_width(), img.get_height()
-                img = pygame.transform.smoothscale(img, (int(w*scale), int(h*scale)))
-            self.screen.blit(img, pos)
-        if "front" in self.ui_images and self.ui_images["front"]:
-            info = UI_IMAGES["front"]
-            img = self.ui_images["front"]
-            pos = info.get("pos", (0, 0))
-            scale = info.get("scale", 1.0)
-            if scale != 1.0:
-                w, h = img.get_width(), img.get_height()
-                img = pygame.transform.smoothscale(img, (int(w*scale), int(h*scale)))
-            self.screen.blit(img, pos)
-        # 2. 绘制所有牌堆
+            bottle.append((img, (x, y + move_offset)))
+        if self.ui_sprites.get("bottlefront"):
+            bottle.append(self.ui_sprites["bottlefront"])
+        layers["bottle"] = bottle
+        layers["front"] = [self.ui_sprites["front"]] if self.ui_sprites.get("front") else []
+        # 2. 所有牌堆
         for i, pile in enumerate(self.game.piles):
-            self.draw_pile(i, pile)
-        # 3. 绘制结算区展示卡牌（延时后自动结算）
-        self.draw_settlement_area()
-        # 4. 绘制正在拖拽的卡牌
-        self.draw_dragging_card()
-        # 5. 绘制生命值数值（左下角）
-        hp_font = pygame.font.SysFont(None, HP_FONT_SIZE)
-        hp_text = hp_font.render(f"HP: {self.game.player.hp}/{self.game.player.max_hp}", True, HP_COLOR)
-        self.screen.blit(hp_text, HP_POS)
-        # 显示全局诅咒牌数值总和（屏幕顶部中央）
+            layers[("pile", i)] = self.pile_layer(i, pile)
+        # 3. 结算区展示卡牌
+        layers["settlement"] = self.settlement_layer()
+        # 4. 正在拖拽的卡牌
+        layers["drag"] = self.dragging_layer()
+        # 5. 生命值数值（左下角）
+        hp_text = font_handler.render(f"HP: {self.game.player.hp}/{self.game.player.max_hp}", HP_FONT_SIZE, HP_COLOR)
+        layers["hp"] = [(hp_text, HP_POS)]
+        # 全局诅咒牌数值总和（屏幕右上角）
         curse_total = self.game.get_total_curse_value()
-        curse_font = pygame.font.SysFont(None, 36)
-        curse_text = curse_font.render(f"curse total: {curse_total}", True, (128, 0, 128))
-        curse_rect = curse_text.get_rect(center=(self.screen_width-100, 30))
-        self.screen.blit(curse_text, curse_rect)
-        # 显示被消灭的诅咒牌总数（位置参数集成到config）
-        #destroyed_curse_text = curse_font.render(f"destroyed value: {self.game.destroyed_curse_total}/52", True, (128, 0, 128))
-        #destroyed_curse_rect = destroyed_curse_text.get_rect(center=DESTROYED_CURSE_TEXT_POS)
-        #self.screen.blit(destroyed_curse_text, destroyed_curse_rect)
+        curse_text = font_handler.render(f"curse total: {curse_total}", 36, (128, 0, 128))
+        layers["curse_total"] = [(curse_text, curse_text.get_rect(center=(self.screen_width-100, 30)).topleft)]
+        # 被消灭的诅咒牌总数（位置参数集成到config）
+        #destroyed_curse_text = font_handler.render(f"destroyed value: {self.game.destroyed_curse_total}/52", 36, (128, 0, 128))
+        #layers["destroyed_curse"] = [(destroyed_curse_text, destroyed_curse_text.get_rect(center=DESTROYED_CURSE_TEXT_POS).topleft)]
         # 难度为1时显示剩余安全移动次数
         if self.difficulty == 1:
             safe_moves_left = max(0, self.move_limit - self.move_count)
-            font = pygame.font.SysFont(None, 32)
-            text = font.render(f"step: {safe_moves_left}", True, (30, 144, 255))
-            text_rect = text.get_rect(bottomright=(self.screen_width - 40, self.screen_height - 40))
-            self.screen.blit(text, text_rect)
-        pygame.display.flip()
+            text = font_handler.render(f"step: {safe_moves_left}", 32, (30, 144, 255))
+            layers["step"] = [(text, text.get_rect(bottomright=(self.screen_width - 40, self.screen_height - 40)).topleft)]
+        return layers
+
+    def invalidate(self):
+        """下一帧重绘并提交整个屏幕（例如弹窗覆盖过画面之后）"""
+        self.previous_layers = None
+
+    def update(self, dt: float):
+        """固定步长的逻辑更新"""
+        self.animation_time += dt
+        if self.settlement_display_cards:
+            self.settlement_elapsed += dt
+        self.update_settlement()
+
+    def draw(self) -> List[pygame.Rect]:
+        """绘制游戏界面：与上一帧比较各图层，只重绘发生变化的区域，返回需要提交的矩形"""
+        # 分辨率变化时重新缩放和合成UI图片
+        if self.screen.get_size() != self.ui_layer_size:
+            self.build_ui_layers()
+            self.invalidate()
+        layers = self.build_layers()
+        screen_rect = self.screen.get_rect()
+        if self.previous_layers is None:
+            dirty = [screen_rect]
+        else:
+            dirty = changed_rects(self.previous_layers, layers, screen_rect)
+        # 每个脏矩形内按顺序重绘所有图层，裁剪区域外的像素不会被触及
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.screen.blit(self.ui_composite, rect, rect)
+            for blits in layers.values():
+                self.screen.blits(blits, doreturn=False)
+        self.screen.set_clip(None)
+        self.previous_layers = layers
+        return dirty
+
+    def present(self, rects: Optional[List[pygame.Rect]] = None):
+        """提交本帧画面，每帧只调用一次；rects 为 None 时提交整个屏幕
+
+        垂直同步时由渲染器整屏提交（flip 会等待刷新），脏矩形只用于减少重绘。
+        """
+        if rects is None or self.vsync:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
 
     def handle_mouse_motion(self, pos: Tuple[int, int]):
         """处理鼠标移动事件"""
@@ -632,7 +638,7 @@ class GameGUI:
         if result is not None:
             pile_index, card_index = result
             pile = self.game.piles[pile_index]
-            top_card_index = len(pile.face_up_cards) - 1
+            top_card_index = pile.face_up_count - 1
             if card_index >= top_card_index - 4:
                 # 播放点击牌的音效
                 music_handler.play_sound("assets/music/cardselect.mp3")
@@ -649,16 +655,13 @@ class GameGUI:
             # 检查是否可以放置到结算区域
             if self.settlement_area_rect.collidepoint(pos):
                 from_pile, from_index = self.drag_card
-                pile = self.game.piles[from_pile]
-                cards_to_settle = pile.face_up_cards[from_index:]
-                # 只在没有展示中的卡牌时才允许新展示
-                if not self.settlement_display_cards:
-                    self.settlement_display_cards = list(cards_to_settle)
-                    self.settlement_display_timer = time.time()
+                # 只在没有展示中的卡牌时才允许新展示：卡牌立即移出牌堆，展示结束后再结算
+                if not self.settlement_display_cards and self.game.begin_settlement(from_pile, from_index)[0]:
+                    self.settlement_display_cards = list(self.game.pending_settlement[2])
+                    self.settlement_elapsed = 0.0
                     self.settlement_display_from_pile = (from_pile, from_index)
                     # 播放放置到结算区的音效
                     music_handler.play_sound("assets/music/cardverify.mp3")
-                # 不立即移除和结算
             else:
                 # 检查是否可以放置到其他牌堆
                 for pile_index, pile in enumerate(self.game.piles):
@@ -674,13 +677,13 @@ class GameGUI:
                             # 难度为1时限制移动次数
                             if self.difficulty == 1:
                                 # 判断是否新回合（可根据你实际的回合切换逻辑调整）
-                                now_turn = self.game.player.hp + sum(len(pile.cards) for pile in self.game.piles)
+                                now_turn = self.game.player.hp + sum(len(pile) for pile in self.game.piles)
                                 if self.last_turn != now_turn:
                                     self.move_count = 0
                                     self.last_turn = now_turn
                                 self.move_count += 1
                                 if self.move_count > self.move_limit:
-                                    self.game.player.take_damage(1)
+                                    self.game.apply_penalty(1)
                             success, message = self.game.move_cards(from_pile, pile_index, from_index)
             # 重置拖动状态
             self.dragging = False
@@ -719,7 +722,7 @@ class GameGUI:
                     if result is not None:
                         pile_index, card_index = result
                         pile = self.game.piles[pile_index]
-                        top_index = len(pile.face_up_cards) - 1
+                        top_index = pile.face_up_count - 1
                         if card_index >= top_index - 4:
                             self.dragging = True
                             self.drag_card = (pile_index, card_index)
@@ -730,14 +733,11 @@ class GameGUI:
                     # 检查是否可以放置到结算区域
                     if self.settlement_area_rect.collidepoint(event.pos):
                         from_pile, from_index = self.drag_card
-                        pile = self.game.piles[from_pile]
-                        cards_to_settle = pile.face_up_cards[from_index:]
-                        # 只在没有展示中的卡牌时才允许新展示
-                        if not self.settlement_display_cards:
-                            self.settlement_display_cards = list(cards_to_settle)
-                            self.settlement_display_timer = time.time()
+                        # 只在没有展示中的卡牌时才允许新展示：卡牌立即移出牌堆，展示结束后再结算
+                        if not self.settlement_display_cards and self.game.begin_settlement(from_pile, from_index)[0]:
+                            self.settlement_display_cards = list(self.game.pending_settlement[2])
+                            self.settlement_elapsed = 0.0
                             self.settlement_display_from_pile = (from_pile, from_index)
-                        # 不立即移除和结算
                     else:
                         # 检查是否可以放置到其他牌堆
                         for pile_index, pile in enumerate(self.game.piles):
@@ -753,13 +753,13 @@ class GameGUI:
                                     # 难度为1时限制移动次数
                                     if self.difficulty == 1:
                                         # 判断是否新回合（可根据你实际的回合切换逻辑调整）
-                                        now_turn = self.game.player.hp + sum(len(pile.cards) for pile in self.game.piles)
+                                        now_turn = self.game.player.hp + sum(len(pile) for pile in self.game.piles)
                                         if self.last_turn != now_turn:
                                             self.move_count = 0
                                             self.last_turn = now_turn
                                         self.move_count += 1
                                         if self.move_count > self.move_limit:
-                                            self.game.player.take_damage(1)
+                                            self.game.apply_penalty(1)
                                     success, message = self.game.move_cards(from_pile, pile_index, from_index)
                     # 重置拖动状态
                     self.dragging = False
@@ -786,6 +786,13 @@ class GameGUI:
     def run(self):
         music_handler.play_music("assets/music/main.ogg", loop=True)
         """运行游戏主循环"""
+        # 每个操作追加到自动存档日志（读档时回合状态已在创建后恢复，这里才开始记录）
+        self.autosaver = AutoSaver(self.game, SAVE_FILE, JOURNAL_FILE, self.difficulty, self.move_count, self.last_turn)
+        # 输入每帧处理，逻辑按 UPDATE_RATE 固定步长推进，每帧只提交一次画面
+        frame_pacer = FramePacer(0 if self.vsync else FRAME_RATE_LIMIT, spin=FRAME_PACER_SPIN)
+        update_step = 1.0 / UPDATE_RATE
+        accumulator = 0.0
+        frame_time = 0.0
         running = True
         while running:
             # 处理事件
@@ -796,26 +803,35 @@ class GameGUI:
                     break
 
             # 如果弹窗显示，暂停所有游戏功能
-            if self.assets.modal_popup and self.assets.modal_popup.is_active:
+            popup = self.assets.modal_popup
+            if popup and popup.is_active:
                 # 只处理弹窗相关的事件
                 for event in events:
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
-                        self.assets.modal_popup.toggle()
-                self.assets.modal_popup.draw()
-                pygame.display.flip()
-                self.clock.tick(60)
+                        popup.toggle()
+                popup.draw()
+                self.present()
+                # 弹窗覆盖了画面，关闭后整屏重绘
+                self.invalidate()
+                frame_time = frame_pacer.tick()
                 continue
 
-            # 处理事件和更新游戏状态
+            # 处理事件
             running = self.handle_events(events)
-            self.draw()
-            self.clock.tick(60)
-            
-            # 处理modal_popup
-            if self.assets.modal_popup:
-                self.assets.modal_popup.draw()
-            
-            pygame.display.flip()
+            # 固定步长更新逻辑
+            accumulator += min(frame_time, MAX_FRAME_TIME)
+            while accumulator >= update_step:
+                self.update(update_step)
+                accumulator -= update_step
+            self.autosaver.update(self.move_count, self.last_turn)
+
+            dirty = self.draw()
+            if popup and popup.is_active:
+                # 本帧刚打开弹窗
+                popup.draw()
+                self.invalidate()
+                dirty = None
+            self.present(dirty)
 
             # 检查游戏状态
             if self.game.check_game_over():
@@ -824,6 +840,14 @@ class GameGUI:
             elif self.game.check_win_condition():
                 print("恭喜获胜！")
                 running = False
+            frame_time = frame_pacer.tick()
+
+        if SHOW_FRAME_STATS:
+            stats = frame_pacer.stats()
+            print(f"帧率 {stats.fps:.1f}，帧时间 平均 {stats.mean_ms:.2f}ms / p99 {stats.p99_ms:.2f}ms / 最大 {stats.max_ms:.2f}ms")
+
+        # 正常退出时压缩日志并写入退出标记（对局结束时删除存档和日志）
+        self.autosaver.close()
 
         # pygame.quit()
         # sys.exit()
@@ -0,0 +1,187 @@
+import argparse
+import math
+import os
+import random
+import struct
+from functools import partial
+from multiprocessing import Pool
+from typing import Iterable, Iterator, NamedTuple, Optional
+import numpy as np
+from game import Game
+from dealer import DEAL_SIZE, deals_from_seeds
+from solver import Solver, SolveResult
+
+# 牌局库文件格式（小端序）：
+#   文件头  magic(4) 版本(u2) 保留(u2) 条目数(u4) 保留(u4)
+#   条目区  条目数 * RECORD_DTYPE，按写入顺序
+#   索引区  条目数 * INDEX_DTYPE，按难度升序（无解的难度为 inf，排在最后）
+# 整个文件用 np.memmap 映射，多个进程共享页缓存，不需要整体读入内存
+MAGIC = b'CDLB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+PACKED_DEAL_SIZE = DEAL_SIZE * 6 // 8  # 每张牌6位，52张共39字节
+
+# 可解性
+UNKNOWN = -1
+UNSOLVABLE = 0
+SOLVABLE = 1
+
+RECORD_DTYPE = np.dtype([
+    ('seed', '<u8'),
+    ('deal', 'u1', (PACKED_DEAL_SIZE,)),
+    ('solvable', 'i1'),
+    ('solution_length', '<u2'),
+    ('difficulty', '<f4'),
+])
+INDEX_DTYPE = np.dtype([('difficulty', '<f4'), ('record', '<u4')])
+
+
+def pack_deals(deals: np.ndarray) -> np.ndarray:
+    """把 (N, 52) 的卡牌 id 打包成 (N, 39) 字节，每4张牌占3字节"""
+    groups = deals.reshape(len(deals), -1, 4).astype(np.uint32)
+    bits = groups[:, :, 0] | groups[:, :, 1] << 6 | groups[:, :, 2] << 12 | groups[:, :, 3] << 18
+    packed = np.empty((len(deals), bits.shape[1], 3), dtype=np.uint8)
+    for i in range(3):
+        packed[:, :, i] = bits >> (8 * i)
+    return packed.reshape(len(deals), PACKED_DEAL_SIZE)
+
+
+def unpack_deals(packed: np.ndarray) -> np.ndarray:
+    """pack_deals 的逆运算"""
+    triples = packed.reshape(len(packed), -1, 3).astype(np.uint32)
+    bits = triples[:, :, 0] | triples[:, :, 1] << 8 | triples[:, :, 2] << 16
+    deals = np.empty((len(packed), bits.shape[1], 4), dtype=np.uint8)
+    for i in range(4):
+        deals[:, :, i] = (bits >> (6 * i)) & 0x3F
+    return deals.reshape(len(packed), DEAL_SIZE)
+
+
+def difficulty_score(result: SolveResult) -> float:
+    """难度评分：最短路线长度加上搜索节点数的对数；无解或未知时为 inf"""
+    if not result.solved:
+        return math.inf
+    return len(result.line) + math.log2(1 + result.nodes)
+
+
+class LibraryEntry(NamedTuple):
+    """牌局库中的一条记录"""
+    seed: int
+    deal: np.ndarray  # 52个卡牌 id（发牌顺序）
+    solvable: int  # SOLVABLE / UNSOLVABLE / UNKNOWN
+    solution_length: int
+    difficulty: float
+
+    def to_game(self) -> Game:
+        """创建与该记录对应的牌局"""
+        return Game.from_deal(self.deal, self.seed)
+
+
+def write_library(path: str, entries: Iterable[LibraryEntry]):
+    """写入牌局库（先写临时文件再替换，读取方不会看到写了一半的文件）"""
+    entries = list(entries)
+    records = np.zeros(len(entries), dtype=RECORD_DTYPE)
+    if entries:
+        records['seed'] = [entry.seed for entry in entries]
+        records['deal'] = pack_deals(np.array([entry.deal for entry in entries], dtype=np.uint8))
+        records['solvable'] = [entry.solvable for entry in entries]
+        records['solution_length'] = [entry.solution_length for entry in entries]
+        records['difficulty'] = [entry.difficulty for entry in entries]
+    index = np.zeros(len(entries), dtype=INDEX_DTYPE)
+    order = np.argsort(records['difficulty'], kind='stable')
+    index['difficulty'] = records['difficulty'][order]
+    index['record'] = order
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(entries), 0))
+        f.write(records.tobytes())
+        f.write(index.tobytes())
+    os.replace(tmp_path, path)
+
+
+class DealLibrary:
+    """只读的牌局库，通过内存映射按需访问记录"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, _, count, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} 不是牌局库文件")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"不支持的牌局库版本: {version}")
+        self.count = count
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+            self.index = np.memmap(path, dtype=INDEX_DTYPE, mode='r',
+                                   offset=HEADER.size + count * RECORD_DTYPE.itemsize, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, record: int) -> LibraryEntry:
+        """按写入顺序获取记录"""
+        row = self.records[record]
+        return LibraryEntry(int(row['seed']), unpack_deals(row['deal'][None])[0], int(row['solvable']),
+                            int(row['solution_length']), float(row['difficulty']))
+
+    def by_rank(self, rank: int) -> LibraryEntry:
+        """获取难度排名第 rank 的记录（0为最简单）"""
+        return self[int(self.index['record'][rank])]
+
+    def rank_range(self, low: float = -math.inf, high: float = math.inf):
+        """难度在 [low, high] 内的排名范围 (start, end)，在索引上二分查找"""
+        difficulties = self.index['difficulty']
+        return (int(np.searchsorted(difficulties, low, side='left')),
+                int(np.searchsorted(difficulties, high, side='right')))
+
+    def sample(self, rng: random.Random, low: float = -math.inf, high: float = math.inf) -> Optional[LibraryEntry]:
+        """随机抽取一条难度在 [low, high] 内的记录，没有时返回 None"""
+        start, end = self.rank_range(low, high)
+        if start >= end:
+            return None
+        return self.by_rank(rng.randrange(start, end))
+
+
+def _solve_seed(seed: int, deal: np.ndarray, node_limit: int) -> LibraryEntry:
+    result = Solver(node_limit=node_limit).solve(Game.from_deal(deal, seed))
+    if result.solved:
+        solvable = SOLVABLE
+    elif result.solved is None:
+        solvable = UNKNOWN
+    else:
+        solvable = UNSOLVABLE
+    return LibraryEntry(seed, deal, solvable, len(result.line), difficulty_score(result))
+
+
+def solve_seeds(seeds: Iterable[int], node_limit: int = 200_000,
+                processes: Optional[int] = None) -> Iterator[LibraryEntry]:
+    """在进程池中求解一批种子，按种子顺序产出记录"""
+    seeds = list(seeds)
+    deals = deals_from_seeds(seeds)
+    worker = partial(_solve_seed, node_limit=node_limit)
+    with Pool(processes) as pool:
+        yield from pool.starmap(worker, zip(seeds, deals), chunksize=16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="求解一批种子并写入牌局库")
+    parser.add_argument('path', help="牌局库文件")
+    parser.add_argument('--first-seed', type=int, default=0, help="起始种子")
+    parser.add_argument('--games', type=int, default=100, help="局数")
+    parser.add_argument('--node-limit', type=int, default=200_000, help="每局的搜索节点上限")
+    parser.add_argument('--processes', type=int, default=None, help="进程数（默认CPU核数）")
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    entries = list(solve_seeds(seeds, args.node_limit, args.processes))
+    write_library(args.path, entries)
+    solved = sum(entry.solvable == SOLVABLE for entry in entries)
+    print(f"wrote {len(entries)} deals ({solved} solvable) to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from this import d
 import pygame
-from config import screen_width, screen_height
+from config import screen_width, screen_height, SAVE_FILE, JOURNAL_FILE
 from game import Game
 from gui import GameGUI
 from start_menu import StartMenu
@@ -10,6 +10,8 @@ from rule.difficulty import DifficultyMenu
 from rule.modal_popup import ModalPopup
 from rule.end_menu import EndMenu
 from rule.loading import LoadingScreen
+from save import save_writer
+from autosave import recover
 
 def main():
     pygame.init()
@@ -17,15 +19,30 @@ def main():
     
     # 创建弹窗实例
     modal_popup = ModalPopup(screen)
+    # 上次没有正常退出（例如断电）时，用存档加日志末尾重建对局并直接继续
+    snapshot, clean = recover(SAVE_FILE, JOURNAL_FILE)
+    resume = None if clean else snapshot
     while True:
-        # 先显示开始界面
-        menu_result = StartMenu(screen).run()
-        if menu_result == "exit":
-            break
-        # 创建游戏实例
-        game = Game()
-        def start_game(difficulty):
+        if resume is not None:
+            snapshot, resume = resume, None
+        else:
+            # 先显示开始界面
+            menu_result = StartMenu(screen).run()
+            if menu_result == "exit":
+                break
+            snapshot = None
+            if menu_result == "load":
+                snapshot, _ = recover(SAVE_FILE, JOURNAL_FILE)
+                if snapshot is None:
+                    continue
+        # 创建游戏实例（读档时使用存档中的牌局）
+        game = snapshot.game if snapshot else Game()
+        def start_game(difficulty, snapshot=None):
             gui = GameGUI(game, difficulty=difficulty, modal_popup=modal_popup)
+            if snapshot is not None:
+                # 恢复回合状态
+                gui.move_count = snapshot.move_count
+                gui.last_turn = snapshot.last_turn
             gui.run()
             # 检查是否胜利
             if game.check_win_condition():
@@ -35,9 +52,15 @@ def main():
                 loading_screen.run()
             else:
                 EndMenu(screen, game, is_win=False).run()
+        if snapshot is not None:
+            # 读档直接进入对局，跳过规则和难度选择
+            start_game(snapshot.difficulty, snapshot)
+            continue
         rule_menu = RuleMenu(screen, start_game)
         rule_menu.modal_popup = modal_popup
         rule_menu.run()
+    # 等待后台存档写完
+    save_writer.flush(timeout=2)
 
 if __name__ == "__main__": 
     main()
\ No newline at end of file
@@ -1,41 +1,244 @@
 from typing import List, Optional
 from card import Card
+from events import EventEmitter, CARD_FLIPPED
+from zobrist import CARD_KEYS, POSITION_BASE, POSITION_BASE_INVERSE, MASK64, position_power, pile_hash
+
+# 底部预留的空槽数量，回流的诅咒卡插到明牌之前时只需移动暗牌
+BOTTOM_HEADROOM = 8
 
 class Pile:
-    def __init__(self):
-        self.cards: List[Card] = []  # 所有卡牌
-        self.face_up_cards: List[Card] = []  # 正面朝上的卡牌
-        
-    def add_card(self, card: Card):
+    """牌堆：所有卡牌存放在同一个序列中，正面朝上的牌是顶部连续的一段
+
+    _slots[_bottom:] 为从底到顶的卡牌，_slots[_boundary:] 为正面朝上的部分。
+    底部之前保留空槽，在明牌之前插入卡牌时只需把暗牌向前移动一格。
+    """
+
+    def __init__(self, events: Optional[EventEmitter] = None):
+        self._slots: List[Optional[Card]] = [None] * BOTTOM_HEADROOM
+        self._bottom = BOTTOM_HEADROOM  # 底部卡牌在 _slots 中的下标
+        self._boundary = BOTTOM_HEADROOM  # 第一张正面朝上的卡牌在 _slots 中的下标
+        self.curse_count = 0  # 牌堆中诅咒牌的数量（随增删实时维护）
+        self.curse_value = 0  # 牌堆中诅咒牌的数值总和（随增删实时维护）
+        self.version = 0  # 每次修改牌堆时递增，供外部判断缓存是否失效
+        # 暗牌部分和明牌部分分别维护增量哈希，明牌部分的位置从分界处数起（见 zobrist 属性）
+        self._hidden_hash = 0
+        self._face_hash = 0
+        self.events = events  # 翻牌事件分发器（可选）
+
+    @property
+    def zobrist(self) -> int:
+        """牌堆内容的哈希（见 zobrist.py），由两部分组合：H = H暗 + B^暗牌数 * H明"""
+        return (self._hidden_hash + position_power(self._boundary - self._bottom) * self._face_hash) & MASK64
+
+    def _rehash(self):
+        """完整重新计算两部分哈希（开局翻牌、在中间插入或移除时使用）"""
+        self._hidden_hash = pile_hash(self._slots[self._bottom:self._boundary])
+        self._face_hash = pile_hash(self._slots[self._boundary:])
+
+    def _count_in(self, card: Card):
+        if card.type == 'curse':
+            self.curse_count += 1
+            self.curse_value += card.value
+
+    def _count_out(self, card: Card):
+        if card.type == 'curse':
+            self.curse_count -= 1
+            self.curse_value -= card.value
+
+    @property
+    def cards(self) -> List[Card]:
+        """所有卡牌（从底到顶，返回副本）"""
+        return self._slots[self._bottom:]
+
+    @property
+    def face_up_cards(self) -> List[Card]:
+        """正面朝上的卡牌（返回副本）"""
+        return self._slots[self._boundary:]
+
+    @property
+    def hidden_count(self) -> int:
+        """背面朝上的卡牌数量"""
+        return self._boundary - self._bottom
+
+    @property
+    def face_up_count(self) -> int:
+        """正面朝上的卡牌数量"""
+        return len(self._slots) - self._boundary
+
+    def is_face_up(self, index: int) -> bool:
+        """指定位置的卡牌是否正面朝上"""
+        return index >= self.hidden_count
+
+    def top_card(self) -> Optional[Card]:
+        """正面朝上的顶部卡牌"""
+        if self._boundary < len(self._slots):
+            return self._slots[-1]
+        return None
+
+    def face_up_card(self, index: int) -> Card:
+        """获取第 index 张正面朝上的卡牌"""
+        return self._slots[self._boundary + index]
+
+    def peek_face_up(self, start: int, end: int) -> List[Card]:
+        """查看正面朝上部分 [start, end) 的卡牌，不修改牌堆"""
+        return self._slots[self._boundary + start:self._boundary + end]
+
+    def reset(self, cards: List[Card], hidden_count: int):
+        """用给定卡牌重建牌堆（前 hidden_count 张背面朝上）"""
+        self._slots = [None] * BOTTOM_HEADROOM + list(cards)
+        self._bottom = BOTTOM_HEADROOM
+        self._boundary = BOTTOM_HEADROOM + hidden_count
+        self.version += 1
+        self.curse_count = 0
+        self.curse_value = 0
+        for card in cards:
+            self._count_in(card)
+        self._rehash()
+
+    def add_card(self, card: Card, face_up: bool = True):
         """添加一张卡牌到牌堆"""
-        self.cards.append(card)
-        if card.face_up:
-            self.face_up_cards.append(card)
-            
+        if not face_up:
+            if self._boundary != len(self._slots):
+                raise ValueError("不能把背面朝上的牌放在正面朝上的牌上")
+            self._hidden_hash = (self._hidden_hash + CARD_KEYS[card.id] * position_power(self.hidden_count)) & MASK64
+            self._boundary += 1
+        else:
+            self._face_hash = (self._face_hash + CARD_KEYS[card.id] * position_power(self.face_up_count)) & MASK64
+        self._slots.append(card)
+        self.version += 1
+        self._count_in(card)
+
+    def add_cards(self, cards: List[Card]):
+        """把一组正面朝上的卡牌放到牌堆顶部"""
+        position = self.face_up_count
+        h = self._face_hash
+        for card in cards:
+            h += CARD_KEYS[card.id] * position_power(position)
+            position += 1
+        self._face_hash = h & MASK64
+        self._slots.extend(cards)
+        self.version += 1
+        for card in cards:
+            self._count_in(card)
+
+    def insert_face_up(self, start: int, cards: List[Card]):
+        """把一组正面朝上的卡牌插回明牌部分的 start 位置（撤销移动时使用）"""
+        if start >= self.face_up_count:
+            self.add_cards(cards)
+            return
+        position = self._boundary + start
+        self._slots[position:position] = cards
+        self.version += 1
+        for card in cards:
+            self._count_in(card)
+        self._face_hash = pile_hash(self._slots[self._boundary:])
+
     def remove_card(self, index: int) -> Optional[Card]:
         """从牌堆中移除指定位置的卡牌"""
-        if 0 <= index < len(self.cards):
-            card = self.cards.pop(index)
-            if card in self.face_up_cards:
-                self.face_up_cards.remove(card)
+        if 0 <= index < len(self._slots) - self._bottom:
+            hidden = index < self.hidden_count
+            if hidden:
+                self._boundary -= 1
+            card = self._slots.pop(self._bottom + index)
+            self.version += 1
+            self._count_out(card)
+            if index == len(self) and not hidden:
+                self._face_hash = (self._face_hash - CARD_KEYS[card.id] * position_power(self.face_up_count)) & MASK64
+            else:
+                self._rehash()
             return card
         return None
+
+    def remove_face_up(self, start: int, end: int) -> List[Card]:
+        """移除正面朝上部分 [start, end) 的卡牌并返回"""
+        lo = self._boundary + start
+        hi = self._boundary + end
+        removed = self._slots[lo:hi]
+        from_top = hi >= len(self._slots)
+        del self._slots[lo:hi]
+        self.version += 1
+        for card in removed:
+            self._count_out(card)
+        if from_top:
+            # 从顶部移除：逐张减去对应位置的项
+            h = self._face_hash
+            position = start
+            for card in removed:
+                h -= CARD_KEYS[card.id] * position_power(position)
+                position += 1
+            self._face_hash = h & MASK64
+        else:
+            self._face_hash = pile_hash(self._slots[self._boundary:])
+        return removed
+
     def first_flip(self):
-        if self.cards and not self.cards[-1].face_up:
-            for i in range(-4,-1):
-                self.cards[i].flip()
-                self.face_up_cards.append(self.cards[i])
-    def flip_top_card(self):
-        """翻转顶部卡牌"""
-        if self.cards and not self.cards[-1].face_up:
-            self.cards[-1].flip()
-            self.face_up_cards.append(self.cards[-1])
-            
+        """开局翻牌：顶部下方的三张翻开，原顶部的牌作为下一张待翻开的暗牌压在它们下面"""
+        if len(self._slots) > self._bottom and self.face_up_count == 0:
+            count = min(3, len(self._slots) - self._bottom - 1)
+            top = self._slots.pop()
+            self._slots.insert(len(self._slots) - count, top)
+            self._boundary = len(self._slots) - count
+            self.version += 1
+            self._rehash()
+            if self.events:
+                for card in self._slots[self._boundary:]:
+                    self.events.emit(CARD_FLIPPED, pile=self, card=card)
+
+    def flip_top_card(self) -> bool:
+        """翻转顶部卡牌，返回是否翻开了卡牌"""
+        if len(self._slots) > self._bottom and self.face_up_count == 0:
+            self._boundary -= 1
+            card = self._slots[-1]
+            # 最上面的暗牌成为唯一的明牌
+            key = CARD_KEYS[card.id]
+            self._hidden_hash = (self._hidden_hash - key * position_power(self.hidden_count)) & MASK64
+            self._face_hash = key
+            self.version += 1
+            if self.events:
+                self.events.emit(CARD_FLIPPED, pile=self, card=card)
+            return True
+        return False
+
+    def unflip_top_card(self):
+        """把最下面的一张明牌翻回背面（撤销 flip_top_card）"""
+        if self._boundary < len(self._slots):
+            key = CARD_KEYS[self._slots[self._boundary].id]
+            self._hidden_hash = (self._hidden_hash + key * position_power(self.hidden_count)) & MASK64
+            self._face_hash = ((self._face_hash - key) * POSITION_BASE_INVERSE) & MASK64
+            self._boundary += 1
+            self.version += 1
+
     def __len__(self):
-        return len(self.cards)
+        return len(self._slots) - self._bottom
 
     def add_card_to_bottom(self, card: Card):
-        """将卡牌插入牌堆底部"""
-        self.cards.insert(0, card)
-        if card.face_up:
-            self.face_up_cards.insert(0, card) 
\ No newline at end of file
+        """将卡牌正面朝上放到明牌部分的最前面（没有明牌时成为唯一的明牌，暗牌保持不动）"""
+        if self._bottom == 0:
+            # 预留空槽用完时成倍扩充
+            headroom = max(BOTTOM_HEADROOM, len(self._slots))
+            self._slots[0:0] = [None] * headroom
+            self._bottom += headroom
+            self._boundary += headroom
+        # 暗牌整体向底部空槽移动一格，腾出明牌之前的位置
+        self._slots[self._bottom - 1:self._boundary - 1] = self._slots[self._bottom:self._boundary]
+        self._bottom -= 1
+        self._boundary -= 1
+        self._slots[self._boundary] = card
+        self.version += 1
+        self._count_in(card)
+        # 暗牌的位置不变，明牌部分整体后移一位
+        self._face_hash = (CARD_KEYS[card.id] + POSITION_BASE * self._face_hash) & MASK64
+
+    def remove_bottom(self) -> Optional[Card]:
+        """移除明牌部分最前面的卡牌（撤销 add_card_to_bottom）"""
+        if self._boundary >= len(self._slots):
+            return None
+        card = self._slots[self._boundary]
+        self._slots[self._bottom + 1:self._boundary + 1] = self._slots[self._bottom:self._boundary]
+        self._slots[self._bottom] = None
+        self._bottom += 1
+        self._boundary += 1
+        self.version += 1
+        self._count_out(card)
+        self._face_hash = ((self._face_hash - CARD_KEYS[card.id]) * POSITION_BASE_INVERSE) & MASK64
+        return card
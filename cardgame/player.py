@@ -1,6 +1,6 @@
-from typing import List, Tuple
-from card import Card
-from music_handler import music_handler
+from typing import List, Tuple, Optional
+from config import INITIAL_HEALTH
+from events import EventEmitter, DAMAGE_TAKEN, HEALED
 
 class Relic:
     def __init__(self, name: str, description: str, trigger_type: str):
@@ -18,9 +18,10 @@ class Relic:
         return True, f"{self.name} effect activated!"
 
 class Player:
-    def __init__(self, max_hp: int = 100,hp:int = 5):
+    def __init__(self, max_hp: int = 100,hp:int = INITIAL_HEALTH, events: Optional[EventEmitter] = None):
         self.max_hp = max_hp
         self.hp = hp
+        self.events = events if events is not None else EventEmitter()
         self.relics: List[Relic] = []
         self.initialize_relics()
 
@@ -53,15 +54,16 @@ class Player:
     def take_damage(self, damage: int) -> int:
         """受到伤害"""
         self.hp = max(0, self.hp - damage)
-        music_handler.play_sound("assets/music/health.mp3")
+        self.events.emit(DAMAGE_TAKEN, amount=damage, hp=self.hp)
         return damage
 
     def heal(self, amount: int) -> int:
         """恢复生命值"""
         old_hp = self.hp
         self.hp = min(self.max_hp, self.hp + amount)
-        music_handler.play_sound("assets/music/health.mp3")
-        return self.hp - old_hp
+        healed = self.hp - old_hp
+        self.events.emit(HEALED, amount=healed, hp=self.hp)
+        return healed
 
     def get_relic(self, index: int) -> Relic:
         """获取指定索引的遗物"""
@@ -0,0 +1,195 @@
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from game import Game, RULESET_VERSION
+from actions import (ACTION_COUNT, OP_MOVE, OP_SETTLE, OP_BEGIN_SETTLEMENT, OP_RESOLVE_SETTLEMENT,
+                     OP_PENALTY)
+
+# 录像格式：
+#   文件头  MAGIC + varint(规则版本) + varint(zigzag(种子))
+#   操作流  每个操作为 varint(操作码) + 若干 varint 参数
+# 操作码小于 ACTION_COUNT 时是 actions.py 中的动作编号（最常见，1-2字节），
+# 其余为扩展操作码，参数个数见 OP_ARG_COUNTS
+MAGIC = b'CRPL'
+OP_ARG_COUNTS = {
+    OP_MOVE: 3,
+    OP_SETTLE: 2,
+    OP_BEGIN_SETTLEMENT: 2,
+    OP_RESOLVE_SETTLEMENT: 0,
+    OP_PENALTY: 1,
+}
+# 读取时每隔多少个操作保存一个关键帧
+KEYFRAME_INTERVAL = 32
+
+Op = Tuple[int, Tuple[int, ...]]
+
+
+def encode_varint(value: int) -> bytes:
+    """无符号整数编码为 LEB128 变长字节"""
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """从 pos 处解码一个变长整数，返回 (值, 下一个位置)"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("录像数据不完整")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def encode_header(seed: int, ruleset: int = RULESET_VERSION) -> bytes:
+    return MAGIC + encode_varint(ruleset) + encode_varint(zigzag(seed))
+
+
+def encode_op(op: int, *args: int) -> bytes:
+    return encode_varint(op) + b''.join(encode_varint(arg) for arg in args)
+
+
+def decode_ops(data: bytes, pos: int = 0) -> Tuple[List[Op], int]:
+    """解码操作流，返回 (操作列表, 最后一个完整操作之后的位置)
+
+    末尾不完整的操作（例如写入时断电）会被忽略。
+    """
+    ops = []
+    while pos < len(data):
+        try:
+            op, next_pos = decode_varint(data, pos)
+        except ValueError:
+            break
+        if op >= ACTION_COUNT and op not in OP_ARG_COUNTS:
+            raise ValueError(f"未知的操作码: {op}")
+        args = []
+        try:
+            for _ in range(OP_ARG_COUNTS.get(op, 0)):
+                arg, next_pos = decode_varint(data, next_pos)
+                args.append(arg)
+        except ValueError:
+            break
+        ops.append((op, tuple(args)))
+        pos = next_pos
+    return ops, pos
+
+
+def apply_op(game: Game, op: int, args: Tuple[int, ...]) -> Tuple[bool, str]:
+    """在牌局上执行一个录像操作"""
+    if op < ACTION_COUNT:
+        return game.apply_action(op)
+    if op == OP_MOVE:
+        return game.move_cards(*args)
+    if op == OP_SETTLE:
+        return game.settle(*args)
+    if op == OP_BEGIN_SETTLEMENT:
+        return game.begin_settlement(*args)
+    if op == OP_RESOLVE_SETTLEMENT:
+        return game.resolve_settlement()
+    game.apply_penalty(*args)
+    return True, "Penalty applied"
+
+
+class ReplayWriter:
+    """流式录像写入器：作为 Game.recorder 使用，每个操作立即写入文件对象
+
+        with open(path, 'wb') as f:
+            writer = ReplayWriter(f, game)  # 需要在任何操作之前创建
+    """
+
+    def __init__(self, stream: BinaryIO, game: Game):
+        self.stream = stream
+        self.game = game
+        self.count = 0
+        stream.write(encode_header(game.seed))
+        game.recorder = self
+
+    def __call__(self, op: int, *args: int):
+        self.stream.write(encode_op(op, *args))
+        self.count += 1
+
+    def flush(self):
+        self.stream.flush()
+
+    def detach(self):
+        """停止录像"""
+        if self.game.recorder is self:
+            self.game.recorder = None
+        self.flush()
+
+
+class _Keyframe:
+    __slots__ = ('state', 'rng_state', 'returned_curse_count', 'pending_settlement')
+
+    def __init__(self, game: Game):
+        self.state = game.get_state()
+        self.rng_state = game.get_rng_state()
+        self.returned_curse_count = game.returned_curse_count
+        pending = game.pending_settlement
+        self.pending_settlement = (pending[0], pending[1], list(pending[2])) if pending else None
+
+    def restore(self, seed: int) -> Game:
+        game = Game(seed)
+        game.set_state(self.state)
+        game.set_rng_state(self.rng_state)
+        game.returned_curse_count = self.returned_curse_count
+        pending = self.pending_settlement
+        game.pending_settlement = (pending[0], pending[1], list(pending[2])) if pending else None
+        return game
+
+
+class ReplayReader:
+    """录像读取器：解析操作流，按需重建任意操作序号之后的局面
+
+    重放过程中每隔 KEYFRAME_INTERVAL 个操作保存一个关键帧，
+    之后跳转只需从最近的关键帧开始重放不超过 KEYFRAME_INTERVAL 个操作。
+    """
+
+    def __init__(self, data: bytes):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("不是录像文件")
+        self.ruleset, pos = decode_varint(data, len(MAGIC))
+        seed, pos = decode_varint(data, pos)
+        self.seed = unzigzag(seed)
+        self.ops, self.end = decode_ops(data, pos)
+        self.keyframes: Dict[int, _Keyframe] = {}
+
+    @classmethod
+    def open(cls, path: str) -> 'ReplayReader':
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def __len__(self):
+        return len(self.ops)
+
+    def game_at(self, index: Optional[int] = None) -> Game:
+        """返回执行前 index 个操作之后的牌局（默认为全部操作），每次返回新的 Game"""
+        if self.ruleset != RULESET_VERSION:
+            raise ValueError(f"录像的规则版本 {self.ruleset} 与当前版本 {RULESET_VERSION} 不一致")
+        if index is None:
+            index = len(self.ops)
+        if not 0 <= index <= len(self.ops):
+            raise IndexError(index)
+        start = index - index % KEYFRAME_INTERVAL
+        while start and start not in self.keyframes:
+            start -= KEYFRAME_INTERVAL
+        game = self.keyframes[start].restore(self.seed) if start else Game(self.seed)
+        for i in range(start, index):
+            apply_op(game, *self.ops[i])
+            if (i + 1) % KEYFRAME_INTERVAL == 0 and i + 1 not in self.keyframes:
+                self.keyframes[i + 1] = _Keyframe(game)
+        return game
@@ -0,0 +1,113 @@
+import argparse
+import random
+import time
+from functools import partial
+from multiprocessing import Pool
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+from game import Game
+from actions import SETTLE, decode_action, iter_actions
+from solver import order_actions
+
+# 策略：根据当前局面和策略自己的随机数生成器返回一个动作编号（编码见 actions.py）
+Policy = Callable[[Game, random.Random], int]
+
+
+class RolloutResult(NamedTuple):
+    """单局模拟结果"""
+    seed: int
+    win: bool
+    turns: int  # 回合数（每次结算算一回合，与界面一致）
+    actions: int  # 执行的动作总数
+    hp: int  # 结束时的生命值
+    destroyed_curse_total: int
+
+
+def random_policy(game: Game, rng: random.Random) -> int:
+    """在所有合法动作中均匀随机选择"""
+    actions = list(iter_actions(game.legal_actions()))
+    return rng.choice(actions)
+
+
+def greedy_policy(game: Game, rng: random.Random) -> int:
+    """大多数时候按求解器的走法排序选最优动作，偶尔随机探索"""
+    actions = order_actions(game, game.legal_actions())
+    if rng.random() < 0.8:
+        return actions[0]
+    return rng.choice(actions)
+
+
+POLICIES = {
+    'random': random_policy,
+    'greedy': greedy_policy,
+}
+
+
+def play_game(seed: int, policy: Policy = random_policy, max_actions: int = 1000) -> RolloutResult:
+    """用给定策略完整模拟一局"""
+    game = Game(seed=seed)
+    rng = random.Random(seed ^ 0x5EED)
+    turns = 0
+    actions = 0
+    while actions < max_actions and not game.check_game_over() and not game.check_win_condition():
+        mask = game.legal_actions()
+        if not mask:
+            break
+        action = policy(game, rng)
+        game.apply_action(action)
+        actions += 1
+        if decode_action(action)[0] == SETTLE:
+            turns += 1
+    win = game.check_win_condition() and not game.check_game_over()
+    return RolloutResult(seed, win, turns, actions, game.player.hp, game.destroyed_curse_total)
+
+
+def _play_chunk(seeds: List[int], policy: Policy, max_actions: int) -> List[RolloutResult]:
+    return [play_game(seed, policy, max_actions) for seed in seeds]
+
+
+def _chunks(seeds: Iterable[int], chunk_size: int) -> Iterator[List[int]]:
+    chunk = []
+    for seed in seeds:
+        chunk.append(seed)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_rollouts(seeds: Iterable[int], policy: Policy = random_policy, processes: Optional[int] = None,
+                 chunk_size: int = 256, max_actions: int = 1000) -> Iterator[List[RolloutResult]]:
+    """在进程池中并行模拟多局，按块流式返回结果（块的顺序与完成顺序一致）
+
+    每个工作进程一次处理 chunk_size 局，只回传紧凑的结果元组，
+    进程间通信开销随块大小摊薄。策略必须是可 pickle 的模块级函数。
+    """
+    worker = partial(_play_chunk, policy=policy, max_actions=max_actions)
+    with Pool(processes) as pool:
+        for results in pool.imap_unordered(worker, _chunks(seeds, chunk_size)):
+            yield results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行蒙特卡洛模拟")
+    parser.add_argument('--games', type=int, default=10000, help="模拟局数")
+    parser.add_argument('--first-seed', type=int, default=0, help="起始种子")
+    parser.add_argument('--processes', type=int, default=None, help="进程数（默认CPU核数）")
+    parser.add_argument('--chunk-size', type=int, default=256, help="每块局数")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random', help="策略")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    games = wins = 0
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    for results in run_rollouts(seeds, POLICIES[args.policy], args.processes, args.chunk_size):
+        games += len(results)
+        wins += sum(result.win for result in results)
+        print(f"{games}/{args.games} games, win rate {wins / games:.3f}")
+    elapsed = time.perf_counter() - start
+    print(f"done: {games} games in {elapsed:.2f}s ({games / elapsed:.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
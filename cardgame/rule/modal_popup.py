@@ -1,6 +1,7 @@
 import pygame
 from pygame.locals import *
 import numpy as np
+from font_handler import font_handler
 
 class ModalPopup:
     def __init__(self, screen):
@@ -65,8 +66,7 @@ class ModalPopup:
         pygame.draw.rect(popup_surface, (0, 0, 0), border_rect, 3)
         
         # 设置字体
-        title_font = pygame.font.Font("assets/font/IPix.ttf", 48)
-        normal_font = pygame.font.Font("assets/font/IPix.ttf", 24)
+        normal_font = font_handler.get_font(24, "assets/font/IPix.ttf")
 
         # 计算所有文本的总高度
         total_height = len(self.rule_texts) * (normal_font.get_height() + 10) # 每行文本高度+行间距
@@ -77,7 +77,7 @@ class ModalPopup:
        
         # 渲染第一行文本（使用不同颜色）
         first_text = self.rule_texts[0]
-        rendered_first = title_font.render(first_text, True, (0, 0, 0))  # 使用紫色
+        rendered_first = font_handler.render(first_text, 48, (0, 0, 0), "assets/font/IPix.ttf")  # 使用紫色
         first_rect = rendered_first.get_rect()
         first_rect.topleft = (text_x, start_y)
         popup_surface.blit(rendered_first, first_rect)
@@ -88,7 +88,7 @@ class ModalPopup:
             # 分割文本
             lines = text.split('\n')
             for line in lines:
-                rendered_text = normal_font.render(line, True, (0, 0, 0))
+                rendered_text = font_handler.render(line, 24, (0, 0, 0), "assets/font/IPix.ttf")
                 text_rect = rendered_text.get_rect()
                 text_rect.topleft = (text_x, start_y)
                 popup_surface.blit(rendered_text, text_rect)
@@ -3,6 +3,7 @@ from pygame.locals import *
 from typing import Callable
 import time
 from music_handler import music_handler
+from font_handler import font_handler
 from config import screen_width, screen_height, SCALE
 from rule.loading import LoadingScreen
 from rule.difficulty import DifficultyMenu
@@ -115,8 +116,6 @@ class RuleMenu:
     def update(self):
         """更新界面"""
         self.screen.blit(self.bg_img, (0, 0))     
-        # 设置字体
-        font = pygame.font.Font("assets/font/IPix.ttf", int(self.TEXT_FONT_SIZE))
         
         # 拆分文本行
         lines = [line for line in self.rules_text.split('\n') if line.strip()]
@@ -126,7 +125,7 @@ class RuleMenu:
         start_y = (screen_height - total_height) // 2
 
         for i, line in enumerate(lines):
-            text_surface = font.render(line, True, self.TEXT_COLOR)
+            text_surface = font_handler.render(line, int(self.TEXT_FONT_SIZE), self.TEXT_COLOR, "assets/font/IPix.ttf")
             text_rect = text_surface.get_rect()
         # 设置x为水平居中
             text_rect.centerx = screen_width // 2
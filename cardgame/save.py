@@ -0,0 +1,177 @@
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+from game import Game, RULESET_VERSION
+from card import card_from_id
+from state import GameState, PILE_COUNT, PILE_CAPACITY, SLOTS_OFFSET
+from replay import encode_varint, decode_varint, zigzag, unzigzag
+
+# 存档格式（小端序）：
+#   文件头  MAGIC(4) 格式版本(u2) 规则版本(u2) CRC32(u4，校验其后全部内容)
+#   内容    varint 序列：zigzag(种子) 回流次数 生命值 消灭诅咒总值 move_count last_turn 难度+1，
+#           然后是6个牌堆（张数 + 每张1字节编码，与 GameState 相同）、结算区（张数 + 编码）、
+#           等待中的结算（0 或 1 + from_pile start 张数 卡牌 id）
+# 随机数生成器不单独保存，由种子和回流次数重建，一份存档通常只有一百字节左右
+MAGIC = b'CSAV'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+
+
+class Snapshot(NamedTuple):
+    """读档结果：牌局和界面的回合状态"""
+    game: Game
+    move_count: int
+    last_turn: int
+    difficulty: Optional[int]
+
+
+def encode_snapshot(game: Game, move_count: int = 0, last_turn: int = 0, difficulty: Optional[int] = None) -> bytes:
+    """把牌局和界面回合状态编码为存档字节"""
+    body = bytearray()
+    for value in (zigzag(game.seed), game.returned_curse_count, game.player.hp, game.destroyed_curse_total,
+                  move_count, zigzag(last_turn), 0 if difficulty is None else difficulty + 1):
+        body += encode_varint(value)
+    state = game.get_state()
+    for i in range(PILE_COUNT):
+        body += encode_varint(state.pile_length(i)) + state.pile_codes(i)
+    body += encode_varint(len(state.settlement)) + state.settlement
+    pending = game.pending_settlement
+    if pending is None:
+        body += encode_varint(0)
+    else:
+        from_pile, start, cards = pending
+        body += encode_varint(1) + encode_varint(from_pile) + encode_varint(start) + encode_varint(len(cards))
+        body += bytes(card.id for card in cards)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, RULESET_VERSION, zlib.crc32(body)) + bytes(body)
+
+
+def decode_snapshot(data: bytes) -> Snapshot:
+    """从存档字节恢复牌局，格式或校验不符时抛出 ValueError"""
+    if len(data) < HEADER.size:
+        raise ValueError("存档数据不完整")
+    magic, version, ruleset, crc = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("不是存档文件或存档版本不支持")
+    if ruleset != RULESET_VERSION:
+        raise ValueError(f"存档的规则版本 {ruleset} 与当前版本 {RULESET_VERSION} 不一致")
+    body = data[HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise ValueError("存档校验失败")
+
+    values = []
+    pos = 0
+    for _ in range(7):
+        value, pos = decode_varint(body, pos)
+        values.append(value)
+    seed, returned, hp, destroyed, move_count, last_turn, difficulty = values
+    state = GameState(hp=hp, destroyed_curse_total=destroyed)
+    for i in range(PILE_COUNT):
+        length, pos = decode_varint(body, pos)
+        if length > PILE_CAPACITY:
+            raise ValueError("存档数据损坏")
+        offset = SLOTS_OFFSET + i * PILE_CAPACITY
+        state.data[i] = length
+        state.data[offset:offset + length] = body[pos:pos + length]
+        pos += length
+    count, pos = decode_varint(body, pos)
+    state.settlement = bytes(body[pos:pos + count])
+    pos += count
+    pending = None
+    has_pending, pos = decode_varint(body, pos)
+    if has_pending:
+        from_pile, pos = decode_varint(body, pos)
+        start, pos = decode_varint(body, pos)
+        count, pos = decode_varint(body, pos)
+        pending = (from_pile, start, [card_from_id(card_id) for card_id in body[pos:pos + count]])
+
+    game = Game(unzigzag(seed))
+    game.set_state(state)
+    game.rebuild_rng(returned)
+    game.pending_settlement = pending
+    return Snapshot(game, move_count, unzigzag(last_turn), difficulty - 1 if difficulty else None)
+
+
+def write_atomic(path: str, data: bytes):
+    """先写临时文件并落盘，再原子替换目标文件，任何时刻断电都只会看到旧存档或新存档"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> Optional[Snapshot]:
+    """读取存档，不存在或损坏时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            return decode_snapshot(f.read())
+    except (OSError, ValueError) as e:
+        print(f"读取存档失败: {e}")
+        return None
+
+
+class SaveWriter:
+    """后台存档线程：主线程只负责编码（微秒级），写盘在后台完成，不会造成掉帧
+
+    同一路径连续提交多次时只写最新的一份；删除请求同样排队，保证与写入的先后顺序。
+    """
+
+    def __init__(self):
+        # 按提交顺序排列，同一路径只保留最新一份：路径 -> (数据, 写入成功后的回调)
+        self._pending: "OrderedDict[str, Tuple[Optional[bytes], Optional[Callable[[], None]]]]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+
+    def save(self, path: str, data: Optional[bytes], on_written: Optional[Callable[[], None]] = None):
+        """提交一份存档，立即返回
+
+        on_written 在这份数据落盘后由后台线程调用；被同一路径更新的提交取代时不会调用。
+        """
+        with self._condition:
+            # 重新提交的路径移到队尾，保证不同路径的写入和删除按最后一次提交的先后执行
+            self._pending.pop(path, None)
+            self._pending[path] = (data, on_written)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def delete(self, path: str):
+        """提交删除存档的请求（例如对局结束后），立即返回"""
+        self.save(path, None)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已提交的存档全部写完"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                path, (data, on_written) = self._pending.popitem(last=False)
+                self._busy = True
+            try:
+                if data is not None:
+                    write_atomic(path, data)
+                    if on_written is not None:
+                        on_written()
+                elif os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                print(f"写入存档失败: {e}")
+            with self._condition:
+                self._busy = False
+                self._condition.notify_all()
+
+
+# 创建单例实例
+save_writer = SaveWriter()
@@ -0,0 +1,68 @@
+from bisect import bisect_right
+from itertools import accumulate
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+
+
+class SettlementOutcome(NamedTuple):
+    """一次结算的结果（诅咒卡按数值升序排列后的下标划分）
+
+    sorted[:by_defense] 被防御抵消，sorted[by_defense:destroyed] 被攻击消灭，
+    sorted[destroyed:] 返回牌堆并造成伤害。
+    """
+    by_defense: int  # 被防御抵消的诅咒卡数量
+    by_attack: int  # 被攻击消灭的诅咒卡数量
+    attack_used: int  # 攻击实际抵消的诅咒数值（包含部分抵消）
+    damage: int  # 返回牌堆的诅咒卡数值总和
+
+    @property
+    def destroyed(self) -> int:
+        return self.by_defense + self.by_attack
+
+
+class SettlementPreview(NamedTuple):
+    """结算预览：拖入结算区后会发生什么（不修改局面）"""
+    damage: int  # 受到的伤害
+    removed_by_defense: int  # 被防御抵消的诅咒卡数量
+    removed_by_attack: int  # 被攻击消灭的诅咒卡数量
+    returned: int  # 返回牌堆的诅咒卡数量
+    attack_used: int  # 计入 destroyed_curse_total 的数值
+    heal: int  # 实际恢复的生命值
+    hp: int  # 结算后的生命值
+
+
+# 结算表：诅咒数值（升序）-> 前缀和；(诅咒数值, 防御, 攻击) -> 结算结果
+# 一次结算只涉及几张数值为1-16的卡牌，常见组合很少，首次遇到时计算并缓存。
+# 缓存有上限，长时间运行的推演和求解进程中只保留最近用到的组合
+PREFIX_TABLE_SIZE = 1024
+OUTCOME_TABLE_SIZE = 8192
+
+
+@lru_cache(maxsize=PREFIX_TABLE_SIZE)
+def _prefix_sums(curse_values: Tuple[int, ...]) -> Tuple[int, ...]:
+    return (0,) + tuple(accumulate(curse_values))
+
+
+@lru_cache(maxsize=OUTCOME_TABLE_SIZE)
+def _compute(curse_values: Tuple[int, ...], defense: int, attack: int) -> SettlementOutcome:
+    prefix = _prefix_sums(curse_values)
+    total = prefix[-1]
+    if not (defense or attack):
+        # 没有攻击和防御：全部返回
+        return SettlementOutcome(0, 0, 0, total)
+    # 防御抵消能完整覆盖的最长前缀，攻击再从剩余部分开始覆盖
+    by_defense = bisect_right(prefix, defense) - 1
+    defended = prefix[by_defense]
+    by_attack = bisect_right(prefix, defended + attack, lo=by_defense) - 1 - by_defense
+    destroyed = by_defense + by_attack
+    # 攻击有剩余时会部分抵消下一张诅咒卡，但那张卡仍然返回并造成全额伤害
+    attack_used = min(attack, total - defended)
+    return SettlementOutcome(by_defense, by_attack, attack_used, total - prefix[destroyed])
+
+
+def resolve(curse_values: Tuple[int, ...], defense: int, attack: int) -> SettlementOutcome:
+    """查表得到结算结果
+
+    curse_values 为结算区诅咒卡的数值（升序），defense 和 attack 为本次拖入的防御、攻击数值总和。
+    """
+    return _compute(curse_values, defense, attack)
@@ -0,0 +1,176 @@
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+from game import Game
+from actions import SETTLE, decode_action, iter_actions
+from zobrist import MASK64
+
+# 随机数生成器前进步数的哈希系数（诅咒卡回流的落点由它决定，需要区分）
+_RNG_STEP_KEY = 0xC2B2AE3D27D4EB4F
+
+
+class SolveResult(NamedTuple):
+    """求解结果
+
+    solved: True 表示找到必胜路线，False 表示在最大深度内证明无解，
+            None 表示搜索预算（节点数或时间）耗尽，结论未知
+    """
+    solved: Optional[bool]
+    line: List[int]  # 胜利路线（动作编号，编码见 actions.py）
+    nodes: int  # 搜索的节点数
+    elapsed: float  # 耗时（秒）
+
+
+class Solver:
+    """已知牌局的精确求解器：迭代加深搜索 + 置换表 + 走法排序
+
+    在传入的 Game 上通过撤销日志原地搜索，求解结束后恢复原状态。
+    牌局的随机种子视为已知，诅咒卡回流的落点随之确定。
+    """
+
+    def __init__(self, max_depth: int = 200, node_limit: int = 2_000_000, time_limit: Optional[float] = None):
+        self.max_depth = max_depth
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.table: Dict[int, int] = {}  # 置换表：局面哈希 -> 已证明无法在该剩余深度内获胜
+        self.nodes = 0
+        self._deadline = None
+        self._exhausted = False
+        self._depth_cutoff = False
+        self._path_cutoff = False  # 当前子树是否因局面在当前路线上重复而剪枝（结论依赖路线）
+
+    def solve(self, game: Game) -> SolveResult:
+        """求解牌局
+
+        先在最大深度内做一次深度优先搜索尽快找到一条胜利路线，
+        再以"当前最短路线长度 - 1"为深度上限反复搜索，逐步缩短路线。
+        若缩短时整棵树搜索完毕仍无更短路线，则当前路线即为最短。
+        """
+        start = time.perf_counter()
+        self.table = {}
+        self.nodes = 0
+        self._exhausted = False
+        self._deadline = start + self.time_limit if self.time_limit is not None else None
+        saved_journal = game.journal
+        game.start_journal()
+        try:
+            best: List[int] = []
+            solved: Optional[bool] = None
+            depth = self.max_depth
+            while depth >= 0:
+                self._depth_cutoff = False
+                self._path_cutoff = False
+                line: List[int] = []
+                if self._search(game, depth, line, set()):
+                    best = list(line)
+                    solved = True
+                    while game.journal:
+                        game.undo()
+                    # 新的深度上限更小，之前的置换表结论依然成立
+                    depth = len(best) - 1
+                    continue
+                if not self._exhausted and not self._depth_cutoff and not self._path_cutoff and solved is None:
+                    # 整棵搜索树都没有触到深度上限，也没有依赖路线的剪枝，无解
+                    solved = False
+                break
+            return SolveResult(solved, best, self.nodes, time.perf_counter() - start)
+        finally:
+            while game.journal:
+                game.undo()
+            game.journal = saved_journal
+
+    def _search(self, game: Game, remaining: int, line: List[int], path: Set[int]) -> bool:
+        self.nodes += 1
+        if game.check_game_over():
+            return False
+        if game.check_win_condition():
+            return True
+        # 每次结算最多带走4张诅咒卡（至少要有一张攻击或防御），据此估计剩余步数下界
+        if remaining * 4 < sum(pile.curse_count for pile in game.piles):
+            self._depth_cutoff = True
+            return False
+        if self.nodes >= self.node_limit or (self._deadline is not None and time.perf_counter() > self._deadline):
+            self._exhausted = True
+            return False
+
+        key = game.zobrist_hash() ^ ((game.returned_curse_count * _RNG_STEP_KEY) & MASK64)
+        if self.table.get(key, -1) >= remaining:
+            return False
+        if key in path:
+            self._path_cutoff = True
+            return False
+        # 只统计本子树内的路线剪枝，返回时再并入外层
+        outer_cutoff = self._path_cutoff
+        self._path_cutoff = False
+        path.add(key)
+        for action in order_actions(game, game.legal_actions()):
+            game.apply_action(action)
+            line.append(action)
+            if self._search(game, remaining - 1, line, path):
+                path.discard(key)
+                self._path_cutoff = outer_cutoff or self._path_cutoff
+                return True
+            line.pop()
+            game.undo()
+            if self._exhausted:
+                break
+        path.discard(key)
+        # 子树中有路线剪枝时，无解的结论只对当前路线成立，不能写入置换表
+        if not self._exhausted and not self._path_cutoff and self.table.get(key, -1) < remaining:
+            self.table[key] = remaining
+        self._path_cutoff = outer_cutoff or self._path_cutoff
+        return False
+
+
+def order_actions(game: Game, mask: int) -> List[int]:
+    """走法排序：优先能消灭诅咒的结算和能翻开暗牌的移动，最后是会扣血的结算"""
+    scored = []
+    for action in iter_actions(mask):
+        kind, from_pile, to_pile, size = decode_action(action)
+        pile = game.piles[from_pile]
+        face_up_count = pile.face_up_count
+        cards = pile.peek_face_up(face_up_count - size, face_up_count)
+        if kind == SETTLE:
+            curse = sum(c.value for c in cards if c.type == 'curse')
+            power = sum(c.value for c in cards if c.type in ('attack', 'defense'))
+            if curse and power >= curse:
+                score = 100 + curse
+            elif curse:
+                score = -100 - curse
+            elif power:
+                score = -50  # 结算区没有诅咒时攻击和防御会白白浪费
+            else:
+                score = 0
+        elif size == face_up_count and pile.hidden_count:
+            score = 50 + size
+        elif (game.piles[to_pile].curse_count
+              and any(c.type in ('attack', 'defense') for c in cards)):
+            score = 30 + size  # 把攻击或防御叠到含诅咒的牌堆上，为结算做准备
+        elif size == face_up_count and not game.piles[to_pile].face_up_count:
+            score = -10  # 整堆搬到空牌堆没有意义
+        else:
+            score = 10 + size
+        scored.append((score, action))
+    scored.sort(key=lambda item: -item[0])
+    return [action for _, action in scored]
+
+
+def format_line(line: List[int]) -> str:
+    """把动作路线转换为可读文本"""
+    steps = []
+    for action in line:
+        kind, from_pile, to_pile, size = decode_action(action)
+        if kind == SETTLE:
+            steps.append(f"settle {from_pile}x{size}")
+        else:
+            steps.append(f"{from_pile}->{to_pile}x{size}")
+    return ', '.join(steps)
+
+
+if __name__ == "__main__":
+    # 用法：python solver.py <seed> [<seed> ...]
+    solver = Solver()
+    for arg in sys.argv[1:]:
+        result = solver.solve(Game(seed=int(arg)))
+        print(f"seed={arg} solved={result.solved} nodes={result.nodes} "
+              f"time={result.elapsed:.3f}s line=[{format_line(result.line)}]")
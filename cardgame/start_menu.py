@@ -1,5 +1,6 @@
 import pygame
 import sys
+import os
 from config import *
 import time
 from rule.rule_menu import RuleMenu
@@ -119,7 +120,10 @@ class StartMenu:
                         result = "start"
                     elif self.loadgame_btn_rect.collidepoint(event.pos):
                         music_handler.play_sound("assets/music/buttonclick.mp3")
-                        print("点击了Load Game按钮")
+                        # 有存档时才进入读档
+                        if os.path.exists(SAVE_FILE):
+                            running = False
+                            result = "load"
                     elif hasattr(self, 'rule_btn_rect') and self.rule_btn_rect.collidepoint(event.pos):
                         rule_menu = RuleMenu(self.screen)
                         rule_menu.run()
@@ -0,0 +1,95 @@
+from typing import List
+from card import Card, CARD_POOL
+
+# 牌堆数量与单个牌堆容量（整局最多52张牌，全部落在同一牌堆也放得下）
+PILE_COUNT = 6
+PILE_CAPACITY = 52
+
+# 每个槽位一个字节：第7位为正面朝上标记，低6位为卡牌 id（类型下标 * 16 + 数值 - 1）
+FACE_UP_BIT = 0x80
+CARD_ID_MASK = 0x3F
+
+# 缓冲区布局：前6字节为各牌堆长度，之后每个牌堆占PILE_CAPACITY个槽位
+SLOTS_OFFSET = PILE_COUNT
+STATE_SIZE = SLOTS_OFFSET + PILE_COUNT * PILE_CAPACITY
+
+
+def encode_card(card: Card, face_up: bool) -> int:
+    """将卡牌编码为单字节"""
+    return card.id | FACE_UP_BIT if face_up else card.id
+
+
+def decode_card(code: int) -> Card:
+    """从单字节还原卡牌（正反面标记由调用方处理）"""
+    return CARD_POOL[code & CARD_ID_MASK]
+
+
+class GameState:
+    """紧凑的对局状态：六个牌堆打包在一块定长字节缓冲区中，复制只需一次内存拷贝
+
+    结算区内容单独按字节保存，生命值和消灭诅咒总数以整数保存。
+    不包含遗物和历史记录（removed_by_defense/removed_by_attack）。
+    """
+    __slots__ = ('data', 'settlement', 'hp', 'destroyed_curse_total')
+
+    def __init__(self, data: bytearray = None, settlement: bytes = b'', hp: int = 0,
+                 destroyed_curse_total: int = 0):
+        self.data = data if data is not None else bytearray(STATE_SIZE)
+        self.settlement = settlement
+        self.hp = hp
+        self.destroyed_curse_total = destroyed_curse_total
+
+    @classmethod
+    def from_game(cls, game) -> 'GameState':
+        """从Game对象打包状态"""
+        data = bytearray(STATE_SIZE)
+        for i, pile in enumerate(game.piles):
+            data[i] = len(pile.cards)
+            offset = SLOTS_OFFSET + i * PILE_CAPACITY
+            hidden_count = pile.hidden_count
+            for j, card in enumerate(pile.cards):
+                data[offset + j] = encode_card(card, j >= hidden_count)
+        settlement = bytes(encode_card(card, True) for card in game.settlement_area)
+        return cls(data, settlement, game.player.hp, game.destroyed_curse_total)
+
+    def apply_to(self, game):
+        """将状态写回Game对象（重建牌堆中的卡牌）"""
+        for i, pile in enumerate(game.piles):
+            codes = self.pile_codes(i)
+            # 正面朝上的牌总是牌堆顶部连续的一段
+            hidden_count = sum(1 for code in codes if not code & FACE_UP_BIT)
+            pile.reset([decode_card(code) for code in codes], hidden_count)
+        game.settlement_area = [decode_card(code) for code in self.settlement]
+        game.player.hp = self.hp
+        game.destroyed_curse_total = self.destroyed_curse_total
+
+    def copy(self) -> 'GameState':
+        """复制状态"""
+        return GameState(self.data[:], self.settlement, self.hp, self.destroyed_curse_total)
+
+    def pile_length(self, pile_index: int) -> int:
+        """获取牌堆长度"""
+        return self.data[pile_index]
+
+    def pile_codes(self, pile_index: int) -> bytes:
+        """获取牌堆的原始编码（从底到顶）"""
+        offset = SLOTS_OFFSET + pile_index * PILE_CAPACITY
+        return bytes(self.data[offset:offset + self.data[pile_index]])
+
+    def pile_cards(self, pile_index: int) -> List[Card]:
+        """解码牌堆中的卡牌（从底到顶）"""
+        return [decode_card(code) for code in self.pile_codes(pile_index)]
+
+    def as_array(self):
+        """以NumPy数组视图访问缓冲区（需要安装numpy），不复制数据"""
+        import numpy as np
+        return np.frombuffer(self.data, dtype=np.uint8)
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (self.data == other.data and self.settlement == other.settlement
+                and self.hp == other.hp and self.destroyed_curse_total == other.destroyed_curse_total)
+
+    def __hash__(self):
+        return hash((bytes(self.data), self.settlement, self.hp, self.destroyed_curse_total))
@@ -0,0 +1,252 @@
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from config import MAX_HEALTH, INITIAL_HEALTH
+from actions import (PILE_COUNT, MAX_MOVE_CARDS, MOVE_ACTION_COUNT, ACTION_COUNT, EMPTY_TOP_VALUE)
+from state import GameState, PILE_CAPACITY, SLOTS_OFFSET, FACE_UP_BIT
+from dealer import PILE_COUNTS, deal_order, random_deals
+
+# 卡牌 id 的编码与 card.py 一致：类型下标 * 16 + 数值 - 1
+TYPE_ATTACK, TYPE_DEFENSE, TYPE_CURSE, TYPE_HEAL = range(4)
+VALUES_PER_TYPE = 16
+
+# 排序时占位用的诅咒数值，大于任何真实数值
+_NO_CURSE = 1 << 10
+
+
+class VectorEnv:
+    """同时推进 K 局的向量化环境，所有局面都存放在 NumPy 数组中
+
+    cards[k, p, i] 为第 k 局第 p 个牌堆从底数起第 i 张牌的 id，
+    lengths 为各牌堆张数，hidden 为各牌堆暗牌张数（明暗分界）。
+    动作编码与 actions.py 相同，移动校验、结算和诅咒回流都按整批数组运算完成。
+
+    规则与 Game 相同，但诅咒回流的随机落点使用 NumPy 随机数生成器，
+    不会与同一种子的 Game 逐位一致。按规则结算区在两步之间总是空的，因此不单独保存。
+    """
+
+    def __init__(self, num_envs: int, seed: Optional[int] = None, max_hp: int = MAX_HEALTH):
+        self.num_envs = num_envs
+        self.max_hp = max_hp
+        self.rng = np.random.default_rng(seed)
+        self.cards = np.zeros((num_envs, PILE_COUNT, PILE_CAPACITY), dtype=np.uint8)
+        self.lengths = np.zeros((num_envs, PILE_COUNT), dtype=np.int32)
+        self.hidden = np.zeros((num_envs, PILE_COUNT), dtype=np.int32)
+        self.hp = np.zeros(num_envs, dtype=np.int32)
+        self.destroyed_curse_total = np.zeros(num_envs, dtype=np.int32)
+        self.curse_count = np.zeros(num_envs, dtype=np.int32)  # 牌堆中剩余的诅咒牌数量
+        self._rows = np.arange(num_envs)
+        self._sizes = np.arange(1, MAX_MOVE_CARDS + 1)
+        self.reset()
+
+    def reset(self, indices: Optional[np.ndarray] = None):
+        """重新发牌（默认全部，或只重置 indices 指定的局）"""
+        if indices is None:
+            indices = self._rows
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        deals = random_deals(len(indices), self.rng)
+        self.load_deals(indices, deals)
+
+    def load_deals(self, indices: np.ndarray, deals: np.ndarray):
+        """按发牌顺序（每局52个卡牌 id）布置牌局"""
+        self.cards[indices] = 0
+        offset = 0
+        for pile, count in enumerate(PILE_COUNTS):
+            order = np.array(deal_order(count)) + offset
+            self.cards[indices, pile, :count] = deals[:, order]
+            self.lengths[indices, pile] = count
+            self.hidden[indices, pile] = count - min(3, count - 1)
+            offset += count
+        self.hp[indices] = INITIAL_HEALTH
+        self.destroyed_curse_total[indices] = 0
+        self.curse_count[indices] = (deals // VALUES_PER_TYPE == TYPE_CURSE).sum(axis=1)
+
+    def load_game(self, index: int, game):
+        """把一个 Game 的当前局面载入第 index 局"""
+        self.cards[index] = 0
+        for pile_index, pile in enumerate(game.piles):
+            ids = [card.id for card in pile.cards]
+            self.cards[index, pile_index, :len(ids)] = ids
+            self.lengths[index, pile_index] = len(ids)
+            self.hidden[index, pile_index] = pile.hidden_count
+        self.hp[index] = game.player.hp
+        self.destroyed_curse_total[index] = game.destroyed_curse_total
+        self.curse_count[index] = sum(pile.curse_count for pile in game.piles)
+
+    def to_state(self, index: int) -> GameState:
+        """把第 index 局导出为 GameState，可用 Game.set_state 载入"""
+        data = bytearray(SLOTS_OFFSET + PILE_COUNT * PILE_CAPACITY)
+        slots = np.frombuffer(data, dtype=np.uint8, offset=SLOTS_OFFSET).reshape(PILE_COUNT, PILE_CAPACITY)
+        data[:PILE_COUNT] = self.lengths[index].astype(np.uint8).tobytes()
+        positions = np.arange(PILE_CAPACITY)
+        face_up = (positions >= self.hidden[index, :, None]) & (positions < self.lengths[index, :, None])
+        slots[:] = np.where(positions < self.lengths[index, :, None], self.cards[index], 0)
+        slots[face_up] |= FACE_UP_BIT
+        return GameState(data, b'', int(self.hp[index]), int(self.destroyed_curse_total[index]))
+
+    def _top_values(self) -> np.ndarray:
+        """各牌堆顶部明牌的数值，没有明牌时为 EMPTY_TOP_VALUE"""
+        top_index = np.maximum(self.lengths - 1, 0)
+        top_ids = np.take_along_axis(self.cards, top_index[:, :, None], axis=2)[:, :, 0]
+        return np.where(self.lengths > self.hidden, top_ids % VALUES_PER_TYPE + 1, EMPTY_TOP_VALUE)
+
+    def legal_mask(self) -> np.ndarray:
+        """所有局的合法动作掩码，形状 (K, ACTION_COUNT)"""
+        face_up = self.lengths - self.hidden
+        # 拖动 1-5 张时最底下那张牌的数值
+        start = np.maximum(self.lengths[:, :, None] - self._sizes, 0)
+        source_values = np.take_along_axis(self.cards, start, axis=2) % VALUES_PER_TYPE + 1
+        source_ok = self._sizes <= face_up[:, :, None]
+        top = self._top_values()
+        moves = (source_ok[:, :, None, :]
+                 & (source_values[:, :, None, :] < top[:, None, :, None])
+                 & ~np.eye(PILE_COUNT, dtype=bool)[None, :, :, None])
+        mask = np.empty((self.num_envs, ACTION_COUNT), dtype=bool)
+        mask[:, :MOVE_ACTION_COUNT] = moves.reshape(self.num_envs, -1)
+        mask[:, MOVE_ACTION_COUNT:] = source_ok.reshape(self.num_envs, -1)
+        return mask
+
+    def done(self) -> np.ndarray:
+        """各局是否结束（失败或胜利）"""
+        return (self.hp <= 0) | (self.curse_count == 0)
+
+    def won(self) -> np.ndarray:
+        """各局是否胜利"""
+        return (self.hp > 0) & (self.curse_count == 0)
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """每局执行一个动作，返回 (动作是否合法, 本步受到的伤害)
+
+        非法动作不改变对应局面；已结束的局也会照常执行，由调用方负责 reset。
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        is_settle = actions >= MOVE_ACTION_COUNT
+        move_pair, move_size = np.divmod(np.where(is_settle, 0, actions), MAX_MOVE_CARDS)
+        settle_from, settle_size = np.divmod(np.where(is_settle, actions - MOVE_ACTION_COUNT, 0), MAX_MOVE_CARDS)
+        from_pile = np.where(is_settle, settle_from, move_pair // PILE_COUNT)
+        to_pile = np.where(is_settle, -1, move_pair % PILE_COUNT)
+        size = np.where(is_settle, settle_size, move_size) + 1
+
+        rows = self._rows
+        source_length = self.lengths[rows, from_pile]
+        start = source_length - size
+        valid = size <= source_length - self.hidden[rows, from_pile]
+        # 拖动的卡牌（最多5张），不足5张的位置用 taken_mask 屏蔽
+        offsets = np.arange(MAX_MOVE_CARDS)
+        taken_mask = offsets < size[:, None]
+        taken_index = np.clip(start[:, None] + offsets, 0, PILE_CAPACITY - 1)
+        taken = self.cards[rows[:, None], from_pile[:, None], taken_index]
+
+        safe_to = np.maximum(to_pile, 0)
+        top = self._top_values()[rows, safe_to]
+        moving = valid & ~is_settle & (to_pile != from_pile) & (taken[:, 0] % VALUES_PER_TYPE + 1 < top)
+        settling = valid & is_settle
+        valid = moving | settling
+
+        self._apply_moves(moving, from_pile, safe_to, size, taken, taken_mask)
+        damage = self._apply_settlements(settling, from_pile, size, taken, taken_mask)
+        # 源牌堆没有明牌时翻开顶部暗牌
+        self._flip_if_needed(valid, from_pile)
+        return valid, damage
+
+    def _apply_moves(self, moving, from_pile, to_pile, size, taken, taken_mask):
+        idx = np.flatnonzero(moving)
+        if not len(idx):
+            return
+        target_length = self.lengths[idx, to_pile[idx]]
+        positions = np.clip(target_length[:, None] + np.arange(MAX_MOVE_CARDS), 0, PILE_CAPACITY - 1)
+        mask = taken_mask[idx]
+        rows = np.broadcast_to(idx[:, None], positions.shape)
+        piles = np.broadcast_to(to_pile[idx, None], positions.shape)
+        self.cards[rows[mask], piles[mask], positions[mask]] = taken[idx][mask]
+        self.lengths[idx, to_pile[idx]] += size[idx]
+        self.lengths[idx, from_pile[idx]] -= size[idx]
+
+    def _apply_settlements(self, settling, from_pile, size, taken, taken_mask) -> np.ndarray:
+        damage = np.zeros(self.num_envs, dtype=np.int32)
+        idx = np.flatnonzero(settling)
+        if not len(idx):
+            return damage
+        self.lengths[idx, from_pile[idx]] -= size[idx]
+
+        cards = taken[idx].astype(np.int32)
+        mask = taken_mask[idx]
+        types = cards // VALUES_PER_TYPE
+        values = np.where(mask, cards % VALUES_PER_TYPE + 1, 0)
+        is_curse = mask & (types == TYPE_CURSE)
+        defense = np.where(types == TYPE_DEFENSE, values, 0).sum(axis=1)
+        attack = np.where(types == TYPE_ATTACK, values, 0).sum(axis=1)
+        heal = np.where(types == TYPE_HEAL, values, 0).sum(axis=1)
+        curse_total = np.where(is_curse, values, 0).sum(axis=1)
+        curse_n = is_curse.sum(axis=1)
+
+        # 有攻击或防御时：诅咒按数值升序，先用防御抵消前缀，再用攻击消灭接下来的前缀
+        fighting = (defense > 0) | (attack > 0)
+        sorted_curse = np.sort(np.where(is_curse, values, _NO_CURSE), axis=1)
+        prefix = np.cumsum(sorted_curse, axis=1)
+        real = np.arange(MAX_MOVE_CARDS) < curse_n[:, None]
+        by_defense = (real & (prefix <= defense[:, None])).sum(axis=1)
+        defended = prefix_at(prefix, by_defense)
+        by_attack = (real & (prefix - defended[:, None] <= attack[:, None])
+                     & (np.arange(MAX_MOVE_CARDS) >= by_defense[:, None])).sum(axis=1)
+        remaining_total = curse_total - defended
+        attack_used = np.minimum(attack, remaining_total)
+        destroyed = np.where(fighting, by_defense + by_attack, 0)
+        # 只拖入诅咒牌时按原顺序全部回流，否则按升序回流未被消灭的部分
+        returned_cards = np.where(fighting[:, None], self._sorted_curse_ids(cards, is_curse),
+                                  self._stable_curse_ids(cards, is_curse))
+        returned_n = curse_n - destroyed
+        # 伤害为回流诅咒卡的数值总和（被部分抵消的那张也按全额计算）
+        hit = curse_total - prefix_at(prefix, destroyed)
+
+        self.destroyed_curse_total[idx] += np.where(fighting, attack_used, 0)
+        self.curse_count[idx] -= destroyed
+        hp = np.maximum(self.hp[idx] - hit, 0)
+        self.hp[idx] = np.minimum(self.max_hp, hp + heal)
+        damage[idx] = hit
+
+        # 回流的诅咒卡逐张放回随机牌堆
+        for slot in range(MAX_MOVE_CARDS):
+            source_slot = destroyed + slot
+            active = slot < returned_n
+            if not active.any():
+                break
+            rows = idx[active]
+            card_ids = np.take_along_axis(returned_cards, np.minimum(source_slot, MAX_MOVE_CARDS - 1)[:, None], 1)[:, 0]
+            self._insert_bottom(rows, self.rng.integers(0, PILE_COUNT, size=len(rows)), card_ids[active])
+        return damage
+
+    @staticmethod
+    def _sorted_curse_ids(cards, is_curse):
+        # 与 sorted_curse 对应的卡牌 id（诅咒 id 按数值单调，直接排序即可）
+        return np.sort(np.where(is_curse, cards, _NO_CURSE), axis=1)
+
+    @staticmethod
+    def _stable_curse_ids(cards, is_curse):
+        # 保持拖入顺序，把诅咒牌排到前面
+        order = np.argsort(~is_curse, axis=1, kind='stable')
+        return np.take_along_axis(np.where(is_curse, cards, _NO_CURSE), order, 1)
+
+    def _insert_bottom(self, rows, piles, card_ids):
+        # 与 Pile.add_card_to_bottom 相同：卡牌正面朝上放到明牌部分最前面，暗牌数量不变
+        pile_cards = self.cards[rows, piles]
+        boundary = self.hidden[rows, piles][:, None]
+        positions = np.arange(PILE_CAPACITY)
+        shifted = np.concatenate([pile_cards[:, :1], pile_cards[:, :-1]], axis=1)
+        pile_cards = np.where(positions < boundary, pile_cards,
+                              np.where(positions == boundary, card_ids[:, None], shifted))
+        self.cards[rows, piles] = pile_cards
+        self.lengths[rows, piles] += 1
+
+    def _flip_if_needed(self, valid, from_pile):
+        rows = np.flatnonzero(valid)
+        piles = from_pile[rows]
+        flip = (self.lengths[rows, piles] > 0) & (self.lengths[rows, piles] == self.hidden[rows, piles])
+        self.hidden[rows[flip], piles[flip]] -= 1
+
+
+def prefix_at(prefix: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """前 count 个元素之和（count 为0时为0）"""
+    picked = np.take_along_axis(prefix, np.maximum(count - 1, 0)[:, None], 1)[:, 0]
+    return np.where(count > 0, picked, 0)
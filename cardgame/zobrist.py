@@ -0,0 +1,57 @@
+import random
+from typing import List
+from card import Card, CARD_POOL
+from state import PILE_COUNT, PILE_CAPACITY
+
+# 64位 Zobrist 键表（固定种子生成，不同进程、不同运行得到相同的哈希值）
+#
+# 牌堆内容的哈希为 sum(CARD_KEYS[card.id] * POSITION_BASE ** i)，i 为从底部数起的位置。
+# 牌堆分别维护暗牌部分 H暗 和明牌部分 H明（位置从明暗分界数起），H = H暗 + POSITION_BASE ** 暗牌数 * H明。
+# 放到顶部、从顶部移除只需加减一项；翻牌和撤销翻牌在两部分之间移动一项；在明牌部分最前面插入为
+# H明' = CARD_KEYS[card.id] + POSITION_BASE * H明，移除时乘以逆元还原，都是 O(1)。
+# 只有开局翻牌和在明牌中间插入、移除时重新计算。整局哈希再把各牌堆、明暗分界、生命值和结算区异或到一起。
+MASK64 = (1 << 64) - 1
+
+_rng = random.Random(0x52594F5255)
+CARD_KEYS: List[int] = [_rng.getrandbits(64) for _ in CARD_POOL]
+POSITION_BASE = _rng.getrandbits(64) | 1
+POSITION_BASE_INVERSE = pow(POSITION_BASE, -1, 1 << 64)  # 移除明牌部分最前面的卡牌时用于还原哈希
+POSITION_POWERS: List[int] = [pow(POSITION_BASE, i, 1 << 64) for i in range(PILE_CAPACITY + 1)]
+HIDDEN_KEYS: List[int] = [_rng.getrandbits(64) for _ in range(PILE_CAPACITY + 1)]
+PILE_KEYS: List[int] = [_rng.getrandbits(64) | 1 for _ in range(PILE_COUNT)]
+HP_KEYS: List[int] = [_rng.getrandbits(64) for _ in range(256)]
+SETTLEMENT_KEYS: List[int] = [_rng.getrandbits(64) for _ in CARD_POOL]
+
+
+def position_power(index: int) -> int:
+    """POSITION_BASE 的 index 次方（模 2^64）"""
+    if index < len(POSITION_POWERS):
+        return POSITION_POWERS[index]
+    return pow(POSITION_BASE, index, 1 << 64)
+
+
+def pile_hash(cards: List[Card]) -> int:
+    """完整计算一组卡牌（从底到顶）的牌堆哈希"""
+    h = 0
+    for i, card in enumerate(cards):
+        h += CARD_KEYS[card.id] * position_power(i)
+    return h & MASK64
+
+
+def hp_key(hp: int) -> int:
+    """生命值的哈希键"""
+    if 0 <= hp < len(HP_KEYS):
+        return HP_KEYS[hp]
+    return (hp * 0x9E3779B97F4A7C15) & MASK64
+
+
+def game_hash(game) -> int:
+    """组合各牌堆的增量哈希，得到整局的64位哈希"""
+    h = hp_key(game.player.hp)
+    for i, pile in enumerate(game.piles):
+        h ^= ((pile.zobrist ^ HIDDEN_KEYS[pile.hidden_count]) * PILE_KEYS[i]) & MASK64
+    # 结算区是多重集合，用加法累计避免相同卡牌互相抵消
+    settlement = 0
+    for card in game.settlement_area:
+        settlement += SETTLEMENT_KEYS[card.id]
+    return h ^ (settlement & MASK64)